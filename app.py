@@ -5,21 +5,25 @@ Main Streamlit application
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-import time
 import pytz
+from streamlit_autorefresh import st_autorefresh
 
 # Import modules
-from config import SECTORS, SECTOR_INDICATORS, APP_CONFIG, INDICATOR_PARAMS, INDICATOR_EXPLANATIONS
-from data_loader import load_sector_data, validate_data, get_latest_price, get_price_change, filter_data_by_date
-from indicators import (
-    calculate_rsi, calculate_bollinger_bands, calculate_atr,
-    calculate_adx, calculate_stochastic, calculate_vwap,
-    calculate_sma, calculate_ema, calculate_volume_ratio
+from config import (
+    SECTORS, SECTOR_INDICATORS, DEFAULT_SECTOR_CONFIG, APP_CONFIG, INDICATOR_PARAMS,
+    INDICATOR_EXPLANATIONS, SIGNAL_CATEGORIES
 )
+from data_loader import (
+    load_sector_data, validate_data, filter_data_by_date, build_sector_panel, panel_to_arrays
+)
+from indicators import calculate_indicator_matrix, classify_volume_ratio
+from indicators_numba import warm_up
 from trend_analysis import (
-    calculate_trend_indicators, rank_by_trend_strength,
-    get_trend_summary, filter_by_trend_strength
+    calculate_trend_matrix, rank_by_trend_strength,
+    get_trend_summary, filter_by_trend_strength,
+    BULLISH_REMARKS, BEARISH_REMARKS
 )
 
 
@@ -31,6 +35,43 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Columns of the indicator overview table
+INDICATOR_TABLE_COLUMNS = (
+    'Sector', 'Price', 'Change %', 'Primary', 'RSI', 'ADX',
+    'BB Width', 'BB Pos', 'Stoch', 'Volume', 'Signal'
+)
+
+# Signal buckets per indicator: (bins, labels, emojis). A value gets labels[i]
+# where i is the number of bins strictly below it. Strict "below X" bounds are
+# nudged down with np.nextafter so that X itself stays in the middle bucket.
+INDICATOR_SIGNAL_RULES = {
+    'RSI': (
+        np.array([np.nextafter(INDICATOR_PARAMS['RSI']['oversold'], -np.inf), INDICATOR_PARAMS['RSI']['overbought']]),
+        np.array(["Oversold", "Neutral", "Overbought"]),
+        np.array(["🟢", "⚪", "🔴"])
+    ),
+    'ADX': (
+        np.array([20, 25]),
+        np.array(["Weak", "Moderate", "Strong Trend"]),
+        np.array(["🔴", "🟡", "🟢"])
+    ),
+    'BB_Width': (
+        np.array([np.nextafter(2, -np.inf), 10]),
+        np.array(["Squeeze", "Normal", "Expansion"]),
+        np.array(["🟡", "⚪", "🟢"])
+    ),
+    'BB_Position': (
+        np.array([np.nextafter(20, -np.inf), 80]),
+        np.array(["Lower Band", "Middle", "Upper Band"]),
+        np.array(["🟢", "⚪", "🔴"])
+    ),
+    'Stochastic': (
+        np.array([np.nextafter(20, -np.inf), 80]),
+        np.array(["Oversold", "Neutral", "Overbought"]),
+        np.array(["🟢", "⚪", "🔴"])
+    )
+}
+
 
 def display_header():
     """Display application header with timestamp"""
@@ -48,144 +89,93 @@ def display_header():
         st.markdown(f"🕐 `{current_time}`")
 
 
-def calculate_sector_indicators(sector_data):
+@st.cache_data(ttl=APP_CONFIG['cache_ttl'], max_entries=8)
+def calculate_all_sector_indicators(sector_data_dict):
     """
-    Calculate all indicators for a sector
+    Calculate all indicators for every valid sector in one batch
+    
+    Cached on the sector data: the indicator table and the detail view
+    share one batch computation per dataset.
     
     Args:
-        sector_data: DataFrame with OHLCV data
+        sector_data_dict: Dictionary of sector dataframes
     
     Returns:
-        Dictionary with indicator values
+        Dictionary of sector name -> indicator dictionary
     """
-    if not validate_data(sector_data):
-        return None
+    valid_data = {sector: df for sector, df in sector_data_dict.items() if validate_data(df)}
     
-    indicators = {}
+    return _calculate_indicators_unchecked(valid_data)
+
+
+def _calculate_indicators_unchecked(valid_data):
+    """
+    Batch indicator calculation for sectors that already passed validate_data
     
-    # Price data
-    close = sector_data['Close']
-    indicators['price'] = get_latest_price(sector_data)
-    abs_change, pct_change = get_price_change(sector_data, periods=1)
-    indicators['change'] = pct_change
+    Every indicator is computed for all sectors at once on stacked arrays;
+    no per-sector pandas calls are made.
     
-    # RSI
-    rsi = calculate_rsi(close, period=INDICATOR_PARAMS['RSI']['period'])
-    indicators['rsi'] = rsi.iloc[-1] if rsi is not None and len(rsi) > 0 else None
+    Args:
+        valid_data: Dictionary of validated sector dataframes
     
-    # Bollinger Bands
-    bb_middle, bb_upper, bb_lower, bb_width, bb_pos = calculate_bollinger_bands(
-        close,
-        period=INDICATOR_PARAMS['BB']['period'],
-        std_dev=INDICATOR_PARAMS['BB']['std']
+    Returns:
+        Dictionary of sector name -> indicator dictionary
+    """
+    if not valid_data:
+        return {}
+    
+    arrays = panel_to_arrays(build_sector_panel(valid_data))
+    batch = calculate_indicator_matrix(
+        arrays['Close'], arrays['High'], arrays['Low'], arrays['Volume'],
+        rsi_period=INDICATOR_PARAMS['RSI']['period'],
+        bb_period=INDICATOR_PARAMS['BB']['period'],
+        bb_std=INDICATOR_PARAMS['BB']['std'],
+        atr_period=INDICATOR_PARAMS['ATR']['period'],
+        adx_period=INDICATOR_PARAMS['ADX']['period'],
+        stoch_period=INDICATOR_PARAMS['STOCH']['period'],
+        ema_period=INDICATOR_PARAMS['EMA']['period'],
+        sma_period=INDICATOR_PARAMS['SMA']['period'],
+        vwap_lookback=INDICATOR_PARAMS['VWAP']['lookback'],
+        volume_period=20
     )
-    indicators['bb_width'] = bb_width.iloc[-1] if bb_width is not None and len(bb_width) > 0 else None
-    indicators['bb_position'] = bb_pos.iloc[-1] if bb_pos is not None and len(bb_pos) > 0 else None
-    
-    # ADX
-    indicators['adx'] = calculate_adx(sector_data, period=INDICATOR_PARAMS['ADX']['period'])
     
-    # ATR
-    indicators['atr'] = calculate_atr(sector_data, period=INDICATOR_PARAMS['ATR']['period'])
-    
-    # Stochastic
-    indicators['stoch'] = calculate_stochastic(sector_data, period=INDICATOR_PARAMS['STOCH']['period'])
-    
-    # VWAP
-    indicators['vwap'] = calculate_vwap(sector_data, lookback=INDICATOR_PARAMS['VWAP']['lookback'])
-    
-    # Moving Averages
-    indicators['ema'] = calculate_ema(close, period=INDICATOR_PARAMS['EMA']['period'])
-    indicators['sma'] = calculate_sma(close, period=INDICATOR_PARAMS['SMA']['period'])
-    
-    # Volume
-    vol_ratio, vol_class = calculate_volume_ratio(sector_data, period=20)
-    indicators['volume_ratio'] = vol_ratio
-    indicators['volume_class'] = vol_class
+    all_indicators = {}
+    for i, sector in enumerate(valid_data):
+        indicators = {name: (None if pd.isna(values[i]) else values[i]) for name, values in batch.items()}
+        indicators['volume_class'] = classify_volume_ratio(indicators['volume_ratio'])
+        
+        all_indicators[sector] = indicators
     
-    return indicators
+    return all_indicators
 
 
-def get_indicator_signal(indicator_name, value, sector_config):
+def classify_indicator(indicator_name, values):
     """
-    Determine signal based on indicator value
+    Classify values of a threshold-based indicator for many sectors at once
     
     Args:
-        indicator_name: Name of the indicator
-        value: Current indicator value
-        sector_config: Sector-specific configuration
+        indicator_name: Key of INDICATOR_SIGNAL_RULES (RSI, ADX, BB_Width, BB_Position, Stochastic)
+        values: Array-like of indicator values (None/NaN = not available)
     
     Returns:
-        Tuple: (signal, emoji)
+        Tuple: (signals, emojis) arrays aligned with values
     """
-    if value is None:
-        return "N/A", "⚪"
-    
-    primary = sector_config.get('primary', 'Trend')
-    
-    # RSI signals
-    if indicator_name == 'RSI':
-        if value > 70:
-            return "Overbought", "🔴"
-        elif value < 30:
-            return "Oversold", "🟢"
-        else:
-            return "Neutral", "⚪"
-    
-    # ADX signals
-    elif indicator_name == 'ADX':
-        if value > 25:
-            return "Strong Trend", "🟢"
-        elif value > 20:
-            return "Moderate", "🟡"
-        else:
-            return "Weak", "🔴"
-    
-    # BB signals
-    elif indicator_name == 'BB_Width':
-        if value < 2:
-            return "Squeeze", "🟡"
-        elif value > 10:
-            return "Expansion", "🟢"
-        else:
-            return "Normal", "⚪"
-    
-    elif indicator_name == 'BB_Position':
-        if value > 80:
-            return "Upper Band", "🔴"
-        elif value < 20:
-            return "Lower Band", "🟢"
-        else:
-            return "Middle", "⚪"
-    
-    # Stochastic signals
-    elif indicator_name == 'Stochastic':
-        if value > 80:
-            return "Overbought", "🔴"
-        elif value < 20:
-            return "Oversold", "🟢"
-        else:
-            return "Neutral", "⚪"
-    
-    # ATR (volatility)
-    elif indicator_name == 'ATR':
-        return f"{value:.2f}", "⚪"
+    bins, labels, emojis = INDICATOR_SIGNAL_RULES[indicator_name]
+    values = np.asarray(values, dtype=np.float64)
     
-    # VWAP
-    elif indicator_name == 'VWAP':
-        return f"{value:.2f}", "⚪"
+    bucket = np.searchsorted(bins, values, side='left')
+    missing = np.isnan(values)
     
-    # EMA/SMA
-    elif indicator_name in ['EMA', 'SMA']:
-        return f"{value:.2f}", "⚪"
-    
-    return "N/A", "⚪"
+    return np.where(missing, "N/A", labels[bucket]), np.where(missing, "⚪", emojis[bucket])
 
 
 def create_indicator_table(sector_data_dict, n_sessions):
     """
     Create comprehensive indicator table for all sectors
     
+    Cached on (sector data, n_sessions): reruns from unrelated widgets
+    return the previous table.
+    
     Args:
         sector_data_dict: Dictionary of sector dataframes
         n_sessions: Number of sessions for trend analysis
@@ -194,28 +184,34 @@ def create_indicator_table(sector_data_dict, n_sessions):
         DataFrame with all indicators
     """
     rows = []
+    all_indicators = calculate_all_sector_indicators(sector_data_dict)
+    
+    # Classify each indicator column for all sectors at once
+    signal_emojis = {}
+    for indicator_name, key in [('RSI', 'rsi'), ('ADX', 'adx'), ('BB_Width', 'bb_width'),
+                                ('BB_Position', 'bb_position'), ('Stochastic', 'stoch')]:
+        _, signal_emojis[indicator_name] = classify_indicator(
+            indicator_name, [indicators[key] for indicators in all_indicators.values()]
+        )
     
-    for sector, df in sector_data_dict.items():
-        if not validate_data(df):
-            continue
-        
-        indicators = calculate_sector_indicators(df)
-        if indicators is None:
-            continue
-        
-        sector_config = SECTOR_INDICATORS.get(sector, {'primary': 'Trend'})
+    # Green/red votes per sector, counted once across the whole emoji matrix
+    emoji_matrix = np.vstack(list(signal_emojis.values()))
+    green_counts = (emoji_matrix == "🟢").sum(axis=0)
+    red_counts = (emoji_matrix == "🔴").sum(axis=0)
+    
+    for i, (sector, indicators) in enumerate(all_indicators.items()):
+        sector_config = SECTOR_INDICATORS.get(sector, DEFAULT_SECTOR_CONFIG)
         
         # Get signals
-        rsi_signal, rsi_emoji = get_indicator_signal('RSI', indicators['rsi'], sector_config)
-        adx_signal, adx_emoji = get_indicator_signal('ADX', indicators['adx'], sector_config)
-        bb_width_signal, bb_width_emoji = get_indicator_signal('BB_Width', indicators['bb_width'], sector_config)
-        bb_pos_signal, bb_pos_emoji = get_indicator_signal('BB_Position', indicators['bb_position'], sector_config)
-        stoch_signal, stoch_emoji = get_indicator_signal('Stochastic', indicators['stoch'], sector_config)
+        rsi_emoji = signal_emojis['RSI'][i]
+        adx_emoji = signal_emojis['ADX'][i]
+        bb_width_emoji = signal_emojis['BB_Width'][i]
+        bb_pos_emoji = signal_emojis['BB_Position'][i]
+        stoch_emoji = signal_emojis['Stochastic'][i]
         
         # Aggregate signal
-        signals = [rsi_emoji, adx_emoji, bb_width_emoji, bb_pos_emoji, stoch_emoji]
-        green_count = signals.count("🟢")
-        red_count = signals.count("🔴")
+        green_count = green_counts[i]
+        red_count = red_counts[i]
         
         if green_count >= 3:
             aggregate_signal = "🟢 Bullish"
@@ -228,36 +224,37 @@ def create_indicator_table(sector_data_dict, n_sessions):
         else:
             aggregate_signal = "⚪ Neutral"
         
-        row = {
-            'Sector': sector,
-            'Price': f"₹{indicators['price']:.2f}" if indicators['price'] else "N/A",
-            'Change %': f"{indicators['change']:+.2f}%" if indicators['change'] else "N/A",
-            'Primary': sector_config.get('primary', 'N/A'),
-            'RSI': f"{rsi_emoji} {indicators['rsi']:.1f}" if indicators['rsi'] else "⚪ N/A",
-            'ADX': f"{adx_emoji} {indicators['adx']:.1f}" if indicators['adx'] else "⚪ N/A",
-            'BB Width': f"{bb_width_emoji} {indicators['bb_width']:.2f}" if indicators['bb_width'] else "⚪ N/A",
-            'BB Pos': f"{bb_pos_emoji} {indicators['bb_position']:.0f}" if indicators['bb_position'] else "⚪ N/A",
-            'Stoch': f"{stoch_emoji} {indicators['stoch']:.1f}" if indicators['stoch'] else "⚪ N/A",
-            'Volume': indicators['volume_class'] if indicators['volume_class'] else "⚪ N/A",
-            'Signal': aggregate_signal
-        }
-        
-        rows.append(row)
-    
-    df_result = pd.DataFrame(rows)
+        # Positional row, in INDICATOR_TABLE_COLUMNS order
+        rows.append((
+            sector,
+            f"₹{indicators['price']:.2f}" if indicators['price'] else "N/A",
+            f"{indicators['change']:+.2f}%" if indicators['change'] else "N/A",
+            sector_config.get('primary', 'N/A'),
+            f"{rsi_emoji} {indicators['rsi']:.1f}" if indicators['rsi'] else "⚪ N/A",
+            f"{adx_emoji} {indicators['adx']:.1f}" if indicators['adx'] else "⚪ N/A",
+            f"{bb_width_emoji} {indicators['bb_width']:.2f}" if indicators['bb_width'] else "⚪ N/A",
+            f"{bb_pos_emoji} {indicators['bb_position']:.0f}" if indicators['bb_position'] else "⚪ N/A",
+            f"{stoch_emoji} {indicators['stoch']:.1f}" if indicators['stoch'] else "⚪ N/A",
+            indicators['volume_class'] if indicators['volume_class'] else "⚪ N/A",
+            aggregate_signal
+        ))
+    
+    df_result = pd.DataFrame(rows, columns=INDICATOR_TABLE_COLUMNS)
     
     # Sort by Signal strength (Bullish first)
-    signal_order = {"🟢 Bullish": 0, "🟡 Bullish Bias": 1, "⚪ Neutral": 2, "🟠 Bearish Bias": 3, "🔴 Bearish": 4}
-    df_result['_sort'] = df_result['Signal'].map(signal_order)
-    df_result = df_result.sort_values('_sort').drop('_sort', axis=1).reset_index(drop=True)
+    df_result['Signal'] = pd.Categorical(df_result['Signal'], categories=SIGNAL_CATEGORIES, ordered=True)
+    df_result = df_result.sort_values('Signal', kind='stable', ignore_index=True)
     
     return df_result
 
 
+@st.cache_data(ttl=APP_CONFIG['cache_ttl'], max_entries=8)
 def create_trend_indicator_table(sector_data_dict, n_sessions):
     """
     Create Trend Indicator section table
     
+    Cached on (sector data, n_sessions) like create_indicator_table.
+    
     Args:
         sector_data_dict: Dictionary of sector dataframes
         n_sessions: Number of sessions for analysis
@@ -265,16 +262,18 @@ def create_trend_indicator_table(sector_data_dict, n_sessions):
     Returns:
         DataFrame with trend analysis
     """
-    trend_data = []
+    valid_data = {sector: df for sector, df in sector_data_dict.items() if validate_data(df)}
     
-    for sector, df in sector_data_dict.items():
-        if not validate_data(df):
-            continue
-        
-        trend_info = calculate_trend_indicators(df, sector, n_sessions)
-        
-        if trend_info:
-            trend_data.append(trend_info)
+    if not valid_data:
+        return None
+    
+    # All sectors' trend series in one batch on the date-aligned panel
+    arrays = panel_to_arrays(build_sector_panel(valid_data))
+    trend_data = calculate_trend_matrix(
+        list(valid_data),
+        arrays['Close'], arrays['High'], arrays['Low'], arrays['Volume'],
+        n_sessions
+    )
     
     if not trend_data:
         return None
@@ -318,9 +317,13 @@ def display_sector_details(sector_data_dict):
     )
     
     if selected_sector:
-        df = sector_data_dict[selected_sector]
-        indicators = calculate_sector_indicators(df)
-        sector_config = SECTOR_INDICATORS.get(selected_sector, {})
+        # Same cached batch result the indicator table was built from
+        indicators = calculate_all_sector_indicators(sector_data_dict).get(selected_sector)
+        if indicators is None:
+            st.warning(f"⚠️ Not enough data to analyze {selected_sector}")
+            return
+        
+        sector_config = SECTOR_INDICATORS.get(selected_sector, DEFAULT_SECTOR_CONFIG)
         
         col1, col2, col3 = st.columns(3)
         
@@ -460,6 +463,12 @@ def sidebar_controls():
     }
 
 
+@st.cache_resource
+def warm_up_kernels():
+    """Compile the numba indicator kernels once per server process"""
+    warm_up()
+
+
 def main():
     """Main application logic"""
     
@@ -469,9 +478,17 @@ def main():
     # Sidebar controls
     controls = sidebar_controls()
     
+    # Auto-refresh: the browser triggers a rerun when the data cache expires,
+    # without holding the script thread in between
+    if controls['auto_refresh']:
+        st_autorefresh(interval=APP_CONFIG['cache_ttl'] * 1000, key="hourly_refresh")
+    
     # Display selected analysis date and interval
     st.info(f"📍 Analysis for: **{controls['selected_date'].strftime('%Y-%m-%d')}** | Interval: **{controls['interval'].upper()}**")
     
+    # Compile kernels before the first table needs them (no-op after the first run)
+    warm_up_kernels()
+    
     # Load data
     with st.spinner("📡 Loading market data..."):
         sector_data = load_sector_data(
@@ -517,21 +534,21 @@ def main():
                 height=600
             )
             
-            # Summary statistics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            bullish = len(df_indicators[df_indicators['Signal'].str.contains('🟢')])
-            bearish = len(df_indicators[df_indicators['Signal'].str.contains('🔴')])
-            neutral = len(df_indicators[df_indicators['Signal'].str.contains('⚪')])
+            # Summary statistics (one 1x4 table instead of four metric widgets)
+            signal_counts = df_indicators['Signal'].value_counts()
+            bullish = int(signal_counts.get('🟢 Bullish', 0))
+            bearish = int(signal_counts.get('🔴 Bearish', 0))
+            neutral = int(signal_counts.get('⚪ Neutral', 0))
             
-            with col1:
-                st.metric("🟢 Bullish Sectors", bullish)
-            with col2:
-                st.metric("🔴 Bearish Sectors", bearish)
-            with col3:
-                st.metric("⚪ Neutral Sectors", neutral)
-            with col4:
-                st.metric("📊 Total Sectors", len(df_indicators))
+            st.dataframe(
+                pd.DataFrame(
+                    [[bullish, bearish, neutral, len(df_indicators)]],
+                    columns=["🟢 Bullish Sectors", "🔴 Bearish Sectors",
+                             "⚪ Neutral Sectors", "📊 Total Sectors"]
+                ),
+                use_container_width=True,
+                hide_index=True
+            )
         else:
             st.warning("⚠️ No indicator data available")
     
@@ -552,9 +569,9 @@ def main():
             # Trend summary
             summary_col1, summary_col2, summary_col3 = st.columns(3)
             
-            strong_trends = len(df_trend[df_trend['Trend'] == 'Strong'])
-            bullish_trends = len(df_trend[df_trend['Remark'].str.contains('🟢')])
-            bearish_trends = len(df_trend[df_trend['Remark'].str.contains('🔴')])
+            strong_trends = int((df_trend['Trend'] == 'Strong').sum())
+            bullish_trends = int(df_trend['Remark'].isin(BULLISH_REMARKS).sum())
+            bearish_trends = int(df_trend['Remark'].isin(BEARISH_REMARKS).sum())
             
             with summary_col1:
                 st.metric("💪 Strong Trends", strong_trends)
@@ -579,11 +596,6 @@ def main():
     
     with tab3:
         display_sector_details(sector_data)
-    
-    # Auto-refresh logic
-    if controls['auto_refresh']:
-        time.sleep(3600)  # Sleep for 1 hour
-        st.rerun()
 
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ Configuration file for Nifty Sectoral Scanner
 Contains sector mappings and indicator configurations
 """
 
+from types import MappingProxyType
+
 # Nifty Sectoral Indices
 SECTORS = {
     'NIFTY 50': '^NSEI',
@@ -96,6 +98,14 @@ SECTOR_INDICATORS = {
     }
 }
 
+# Configuration for sectors without an entry in SECTOR_INDICATORS
+# (read-only, shared by every lookup)
+DEFAULT_SECTOR_CONFIG = MappingProxyType({
+    'primary': 'Trend',
+    'chart_pattern': 'N/A',
+    'logic': 'Standard technical analysis approach'
+})
+
 # App configuration
 APP_CONFIG = {
     'title': 'Nifty Sectoral Scanner v5.3',
@@ -104,6 +114,9 @@ APP_CONFIG = {
     'cache_ttl': 3600,  # 1 hour
 }
 
+# Aggregate signal labels, ordered from most bullish to most bearish
+SIGNAL_CATEGORIES = ['🟢 Bullish', '🟡 Bullish Bias', '⚪ Neutral', '🟠 Bearish Bias', '🔴 Bearish']
+
 # Indicator parameters
 INDICATOR_PARAMS = {
     'RSI': {'period': 14, 'overbought': 70, 'oversold': 30},
@@ -3,21 +3,153 @@ Data loading and validation module
 Handles downloading and preprocessing of market data
 """
 
+import os
+import json
+import time
+import hashlib
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+# Upper bound on concurrent Yahoo requests per load (Yahoo's 20-symbol batch size)
+MAX_DOWNLOAD_WORKERS = 20
+
+# On-disk download cache location (survives Streamlit restarts)
+YF_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'yf')
+
+
+class FileCache:
+    """
+    File-backed DataFrame cache: one parquet file per key plus a JSON
+    sidecar holding the time it was written
+    """
+    
+    def __init__(self, cache_dir=YF_CACHE_DIR):
+        self.cache_dir = cache_dir
+    
+    def _paths(self, key):
+        digest = hashlib.md5(repr(key).encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + '.parquet', base + '.json'
+    
+    def get(self, key, max_age_hours=1):
+        """
+        Read a cached DataFrame if it is recent enough
+        
+        Args:
+            key: Hashable cache key, e.g. (ticker, period, interval)
+            max_age_hours: Maximum age in hours
+        
+        Returns:
+            Cached DataFrame, or None on a miss or stale entry
+        """
+        data_path, meta_path = self._paths(key)
+        
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                written_at = json.load(f)['timestamp']
+            
+            if (time.time() - written_at) / 3600 > max_age_hours:
+                return None
+            
+            return pd.read_parquet(data_path)
+        
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache entry {key}: {str(e)}")
+            return None
+    
+    def set(self, key, df):
+        """
+        Write a DataFrame to the cache
+        
+        Args:
+            key: Hashable cache key, e.g. (ticker, period, interval)
+            df: DataFrame to store
+        """
+        data_path, meta_path = self._paths(key)
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(data_path)
+            
+            # Sidecar is written last so a partial parquet write is never served
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': list(key), 'timestamp': time.time()}, f)
+        
+        except Exception as e:
+            print(f"Error writing cache entry {key}: {str(e)}")
+
+
+yf_cache = FileCache()
+
+
+def download_ticker(ticker, period='6mo', interval='1d'):
+    """
+    Download OHLCV history for a single ticker
+    
+    Uses a per-ticker yf.Ticker object, which (unlike yf.download and its
+    module-level result store) is safe to call from several threads.
+    
+    Args:
+        ticker: Ticker symbol
+        period: Data period (default: 6 months)
+        interval: Data interval (default: daily)
+    
+    Returns:
+        DataFrame with a timezone-naive datetime index
+    """
+    df = yf.Ticker(ticker).history(period=period, interval=interval)
+    
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    
+    return df
+
+
+def fetch_ticker(ticker, period='6mo', interval='1d', max_age_hours=1):
+    """
+    Get OHLCV history for a ticker, from the on-disk cache when fresh
+    
+    Args:
+        ticker: Ticker symbol
+        period: Data period (default: 6 months)
+        interval: Data interval (default: daily)
+        max_age_hours: Maximum age of a cached copy in hours
+    
+    Returns:
+        DataFrame with a timezone-naive datetime index
+    """
+    key = (ticker, period, interval)
+    
+    df = yf_cache.get(key, max_age_hours)
+    if df is None:
+        df = download_ticker(ticker, period, interval)
+        if not df.empty:
+            yf_cache.set(key, df)
+    
+    return df
+
 
 @st.cache_data(ttl=3600)
-def load_sector_data(sectors, period='6mo', interval='1d'):
+def load_sector_data(sectors, period='6mo', interval='1d', max_age_hours=1):
     """
     Load historical data for all sectors
     
+    Tickers are downloaded concurrently (network-bound), at most
+    MAX_DOWNLOAD_WORKERS at a time, so a cold load takes roughly as long as
+    the slowest single request. Downloads are also kept on disk, so a
+    restart within max_age_hours skips the network entirely.
+    
     Args:
         sectors: Dictionary of sector names and ticker symbols
         period: Data period (default: 6 months)
         interval: Data interval (default: daily)
+        max_age_hours: Maximum age of on-disk cached downloads in hours
     
     Returns:
         Dictionary of DataFrames with sector data
@@ -25,9 +157,17 @@ def load_sector_data(sectors, period='6mo', interval='1d'):
     data = {}
     failed_sectors = []
     
-    for name, ticker in sectors.items():
+    n_workers = min(max(len(sectors), 1), MAX_DOWNLOAD_WORKERS)
+    
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        futures = {
+            name: pool.submit(fetch_ticker, ticker, period, interval, max_age_hours)
+            for name, ticker in sectors.items()
+        }
+    
+    for name, future in futures.items():
         try:
-            df = yf.download(ticker, period=period, interval=interval, progress=False)
+            df = future.result()
             
             if not df.empty and len(df) > 50:
                 # Flatten multi-index columns if present
@@ -39,6 +179,10 @@ def load_sector_data(sectors, period='6mo', interval='1d'):
                 if all(col in df.columns for col in required_cols):
                     df = df[required_cols].copy()
                     df = df.dropna()
+                    
+                    # Prices fit comfortably in float32; Volume stays integer
+                    price_cols = ['Open', 'High', 'Low', 'Close']
+                    df[price_cols] = df[price_cols].astype(np.float32)
                     data[name] = df
                 else:
                     failed_sectors.append(name)
@@ -92,7 +236,7 @@ def get_latest_price(df):
     if not validate_data(df):
         return None
     
-    return df['Close'].iloc[-1]
+    return df['Close'].iat[-1]
 
 
 def get_price_change(df, periods=1):
@@ -109,8 +253,8 @@ def get_price_change(df, periods=1):
     if not validate_data(df) or len(df) < periods + 1:
         return None, None
     
-    current_price = df['Close'].iloc[-1]
-    previous_price = df['Close'].iloc[-(periods + 1)]
+    current_price = df['Close'].iat[-1]
+    previous_price = df['Close'].iat[-(periods + 1)]
     
     abs_change = current_price - previous_price
     pct_change = (abs_change / previous_price) * 100
@@ -174,15 +318,16 @@ def filter_by_date(df, start_date=None, end_date=None):
     if not validate_data(df):
         return None
     
-    filtered_df = df.copy()
+    # One combined mask and a single selection (which already returns a new frame)
+    mask = np.ones(len(df), dtype=bool)
     
     if start_date:
-        filtered_df = filtered_df[filtered_df.index >= pd.to_datetime(start_date)]
+        mask &= df.index >= pd.to_datetime(start_date)
     
     if end_date:
-        filtered_df = filtered_df[filtered_df.index <= pd.to_datetime(end_date)]
+        mask &= df.index <= pd.to_datetime(end_date)
     
-    return filtered_df
+    return df[mask]
 
 
 def calculate_returns(df, period='1d'):
@@ -253,7 +398,7 @@ def get_summary_stats(df):
     
     return {
         'total_days': len(df),
-        'latest_price': df['Close'].iloc[-1],
+        'latest_price': df['Close'].iat[-1],
         'highest_price': df['High'].max(),
         'lowest_price': df['Low'].min(),
         'avg_volume': df['Volume'].mean(),
@@ -280,10 +425,69 @@ def filter_data_by_date(df, reference_date):
     if isinstance(reference_date, str):
         reference_date = pd.Timestamp(reference_date).date()
     
-    # Filter data up to and including the reference date
-    filtered_df = df[df.index.date <= reference_date].copy()
+    # Filter data up to and including the reference date (any bar before the next midnight)
+    cutoff = pd.Timestamp(reference_date).normalize() + pd.Timedelta(days=1)
+    filtered_df = df[df.index < cutoff]
     
     if filtered_df.empty or len(filtered_df) < 50:
         return None
     
     return filtered_df
+
+
+def build_sector_panel(sector_data_dict):
+    """
+    Combine per-sector OHLCV frames into a single date-aligned panel
+    
+    Args:
+        sector_data_dict: Dictionary of sector dataframes
+    
+    Returns:
+        DataFrame indexed by date with (sector, column) MultiIndex columns;
+        NaN where a sector has no bar for a date
+    """
+    return pd.concat(sector_data_dict, axis=1)
+
+
+def panel_to_array(panel, column='Close'):
+    """
+    Extract one column of a sector panel as a (n_sectors, n_bars) array
+    
+    Each sector's bars are right-aligned on its latest bar and its missing
+    dates moved to the front as NaN padding, so [:, -1] holds the latest
+    value of every sector and trailing windows never straddle a gap.
+    
+    Values are float32 (the dtype prices are loaded in); the kernels
+    accumulate sums in float64.
+    
+    Args:
+        panel: Panel from build_sector_panel
+        column: Column to extract (default: Close)
+    
+    Returns:
+        ndarray of shape (n_sectors, n_bars), rows in panel sector order
+    """
+    return panel_to_arrays(panel, (column,))[column]
+
+
+def panel_to_arrays(panel, columns=('Close', 'High', 'Low', 'Volume')):
+    """
+    Extract several columns of a sector panel at once (see panel_to_array)
+    
+    Loaded frames have no partially missing rows (load_sector_data drops
+    them), so every column shares the NaN layout of the first one and the
+    alignment is computed once for all of them.
+    
+    Args:
+        panel: Panel from build_sector_panel
+        columns: Columns to extract (default: Close, High, Low, Volume)
+    
+    Returns:
+        Dictionary of column -> ndarray of shape (n_sectors, n_bars)
+    """
+    values = {column: panel.xs(column, axis=1, level=1).to_numpy(dtype=np.float32).T for column in columns}
+    
+    # Stable sort on "is valid" moves NaNs first and keeps bar order intact
+    order = np.argsort(~np.isnan(values[columns[0]]), axis=1, kind='stable')
+    
+    return {column: np.take_along_axis(array, order, axis=1) for column, array in values.items()}
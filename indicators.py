@@ -5,6 +5,26 @@ Contains all indicator calculation functions
 
 import pandas as pd
 import numpy as np
+from indicators_numba import (
+    indicator_matrix, directional_series, ema_latest, macd_latest, rolling_mean, rolling_std,
+    rsi_series, INDICATOR_COLUMNS, KERNEL_DTYPE
+)
+
+
+def _true_range_np(high, low, close):
+    """True range of every bar (high - low on the first bar, which has no prior close)"""
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    
+    # fmax skips the NaN prior close, like a row-wise pandas max
+    return np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+
+
+def _ema_bars(period, tolerance=1e-10):
+    """Trailing bars holding all but `tolerance` of an EMA's weight"""
+    alpha = 2 / (period + 1)
+    return int(np.ceil(np.log(tolerance) / np.log(1 - alpha)))
 
 
 def calculate_rsi(series, period=14):
@@ -21,14 +41,9 @@ def calculate_rsi(series, period=14):
     if len(series) < period + 1:
         return None
     
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    rsi = rsi_series(series.to_numpy(dtype=np.float64), period)
     
-    return rsi
+    return pd.Series(rsi, index=series.index, name=series.name)
 
 
 def calculate_bollinger_bands(series, period=20, std_dev=2):
@@ -46,8 +61,9 @@ def calculate_bollinger_bands(series, period=20, std_dev=2):
     if len(series) < period:
         return None, None, None, None, None
     
-    middle_band = series.rolling(window=period).mean()
-    std = series.rolling(window=period).std()
+    values = series.to_numpy(dtype=np.float64)
+    middle_band = pd.Series(rolling_mean(values, period), index=series.index)
+    std = pd.Series(rolling_std(values, period), index=series.index)
     
     upper_band = middle_band + (std * std_dev)
     lower_band = middle_band - (std * std_dev)
@@ -55,8 +71,9 @@ def calculate_bollinger_bands(series, period=20, std_dev=2):
     # BB Width (normalized)
     bb_width = ((upper_band - lower_band) / middle_band) * 100
     
-    # BB Position (where price is within bands)
-    bb_position = ((series - lower_band) / (upper_band - lower_band)) * 100
+    # BB Position (where price is within bands); undefined for zero-width bands
+    band_range = upper_band - lower_band
+    bb_position = ((series - lower_band) / band_range.where(band_range != 0)) * 100
     
     return middle_band, upper_band, lower_band, bb_width, bb_position
 
@@ -75,18 +92,14 @@ def calculate_atr(df, period=14):
     if len(df) < period + 1:
         return None
     
-    high = df['High']
-    low = df['Low']
-    close = df['Close']
-    
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-    
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.rolling(window=period).mean()
+    # Only the last `period` true ranges (plus the close before them) matter
+    tr = _true_range_np(
+        df['High'].to_numpy(dtype=np.float64)[-(period + 1):],
+        df['Low'].to_numpy(dtype=np.float64)[-(period + 1):],
+        df['Close'].to_numpy(dtype=np.float64)[-(period + 1):]
+    )
     
-    return atr.iloc[-1] if not atr.empty else None
+    return tr[1:].mean()
 
 
 def calculate_adx(df, period=14):
@@ -103,32 +116,14 @@ def calculate_adx(df, period=14):
     if len(df) < period + 1:
         return None
     
-    high = df['High']
-    low = df['Low']
-    close = df['Close']
-    
-    # Calculate +DM and -DM
-    plus_dm = high.diff()
-    minus_dm = -low.diff()
-    plus_dm[plus_dm < 0] = 0
-    minus_dm[minus_dm < 0] = 0
-    
-    # Calculate True Range
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    
-    # Calculate smoothed TR and DMs
-    atr = tr.rolling(window=period).mean()
-    plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr)
-    minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr)
-    
-    # Calculate DX and ADX
-    dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-    adx = dx.rolling(window=period).mean()
+    adx, _, _ = directional_series(
+        df['High'].to_numpy(dtype=np.float64),
+        df['Low'].to_numpy(dtype=np.float64),
+        df['Close'].to_numpy(dtype=np.float64),
+        period
+    )
     
-    return adx.iloc[-1] if not adx.empty and not pd.isna(adx.iloc[-1]) else None
+    return adx[-1] if not np.isnan(adx[-1]) else None
 
 
 def calculate_adx_series(df, period=14):
@@ -146,34 +141,19 @@ def calculate_adx_series(df, period=14):
         return None, None, None
     
     try:
-        high = df['High']
-        low = df['Low']
-        close = df['Close']
-        
-        # Calculate +DM and -DM
-        plus_dm = high.diff()
-        minus_dm = -low.diff()
-        plus_dm[plus_dm < 0] = 0
-        minus_dm[minus_dm < 0] = 0
-        
-        # Calculate True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        
-        # Calculate smoothed ATR
-        atr = tr.rolling(window=period).mean()
+        # +DM/-DM, true range, DI and ADX in one compiled pass over the columns
+        adx, plus_di, minus_di = directional_series(
+            df['High'].to_numpy(dtype=np.float64),
+            df['Low'].to_numpy(dtype=np.float64),
+            df['Close'].to_numpy(dtype=np.float64),
+            period
+        )
         
-        # Calculate +DI and -DI
-        plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr)
-        minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr)
-        
-        # Calculate DX and ADX
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(window=period).mean()
-        
-        return adx, plus_di, minus_di
+        return (
+            pd.Series(adx, index=df.index),
+            pd.Series(plus_di, index=df.index),
+            pd.Series(minus_di, index=df.index)
+        )
     except Exception as e:
         print(f"Error calculating ADX series: {str(e)}")
         return None, None, None
@@ -193,12 +173,15 @@ def calculate_stochastic(df, period=14):
     if len(df) < period:
         return None
     
-    low_min = df['Low'].rolling(window=period).min()
-    high_max = df['High'].rolling(window=period).max()
+    # Only the last window's range matters
+    low_min = df['Low'].to_numpy(dtype=np.float64)[-period:].min()
+    high_max = df['High'].to_numpy(dtype=np.float64)[-period:].max()
+    close = df['Close'].to_numpy(dtype=np.float64)[-1]
     
-    stoch_k = 100 * ((df['Close'] - low_min) / (high_max - low_min))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch_k = 100 * ((close - low_min) / (high_max - low_min))
     
-    return stoch_k.iloc[-1] if not stoch_k.empty and not pd.isna(stoch_k.iloc[-1]) else None
+    return stoch_k if not np.isnan(stoch_k) else None
 
 
 def calculate_vwap(df, lookback=20):
@@ -215,12 +198,20 @@ def calculate_vwap(df, lookback=20):
     if len(df) < lookback:
         return None
     
-    df_temp = df.tail(lookback).copy()
+    high = df['High'].to_numpy(dtype=np.float64)[-lookback:]
+    low = df['Low'].to_numpy(dtype=np.float64)[-lookback:]
+    close = df['Close'].to_numpy(dtype=np.float64)[-lookback:]
+    volume = df['Volume'].to_numpy(dtype=np.float64)[-lookback:]
     
-    typical_price = (df_temp['High'] + df_temp['Low'] + df_temp['Close']) / 3
-    vwap = (typical_price * df_temp['Volume']).sum() / df_temp['Volume'].sum()
+    # Missing bars are skipped, as Series.sum() skipped them
+    total_volume = np.nansum(volume)
+    if total_volume == 0:
+        return None
     
-    return vwap if not pd.isna(vwap) else None
+    typical_price = (high + low + close) / 3
+    vwap = np.nansum(typical_price * volume) / total_volume
+    
+    return vwap if not np.isnan(vwap) else None
 
 
 def calculate_sma(series, period=200):
@@ -237,9 +228,10 @@ def calculate_sma(series, period=200):
     if len(series) < period:
         return None
     
-    sma = series.rolling(window=period).mean()
+    values = series.to_numpy(dtype=np.float64)
+    sma = values[len(values) - period:].mean()
     
-    return sma.iloc[-1] if not sma.empty and not pd.isna(sma.iloc[-1]) else None
+    return sma if not np.isnan(sma) else None
 
 
 def calculate_ema(series, period=20):
@@ -256,9 +248,13 @@ def calculate_ema(series, period=20):
     if len(series) < period:
         return None
     
-    ema = series.ewm(span=period, adjust=False).mean()
+    # Older bars carry less than 1e-10 of the weight, so only the tail is read
+    values = series.to_numpy(dtype=np.float64)[-_ema_bars(period):]
+    
+    # EMA seeded with the first valid tail bar (adjust=False); NaN bars are skipped
+    ema = ema_latest(values, period)
     
-    return ema.iloc[-1] if not ema.empty and not pd.isna(ema.iloc[-1]) else None
+    return ema if not np.isnan(ema) else None
 
 
 def calculate_volume_ratio(df, period=20):
@@ -275,7 +271,7 @@ def calculate_volume_ratio(df, period=20):
     if len(df) < period + 1:
         return None, "N/A"
     
-    current_volume = df['Volume'].iloc[-1]
+    current_volume = df['Volume'].iat[-1]
     avg_volume = df['Volume'].tail(period).mean()
     
     if avg_volume == 0:
@@ -283,19 +279,32 @@ def calculate_volume_ratio(df, period=20):
     
     vol_ratio = current_volume / avg_volume
     
-    # Classify volume
+    return vol_ratio, classify_volume_ratio(vol_ratio)
+
+
+def classify_volume_ratio(vol_ratio):
+    """
+    Classify a volume ratio (current vs average volume)
+    
+    Args:
+        vol_ratio: Volume ratio, or None
+    
+    Returns:
+        String: Volume class with emoji ("N/A" when unavailable)
+    """
+    if vol_ratio is None:
+        return "N/A"
+    
     if vol_ratio > 2.0:
-        vol_class = "🟢 Very High"
+        return "🟢 Very High"
     elif vol_ratio > 1.5:
-        vol_class = "🟡 High"
+        return "🟡 High"
     elif vol_ratio > 0.8:
-        vol_class = "⚪ Normal"
+        return "⚪ Normal"
     elif vol_ratio > 0.5:
-        vol_class = "🟠 Low"
+        return "🟠 Low"
     else:
-        vol_class = "🔴 Very Low"
-    
-    return vol_ratio, vol_class
+        return "🔴 Very Low"
 
 
 def calculate_cmf(df, period=21):
@@ -312,6 +321,47 @@ def calculate_cmf(df, period=21):
     if len(df) < period:
         return None
     
+    try:
+        # Only the last window feeds the current value
+        high = df['High'].to_numpy(dtype=np.float64)[-period:]
+        low = df['Low'].to_numpy(dtype=np.float64)[-period:]
+        close = df['Close'].to_numpy(dtype=np.float64)[-period:]
+        volume = df['Volume'].to_numpy(dtype=np.float64)[-period:]
+        
+        # Money Flow Multiplier, 0 where High == Low
+        high_low_diff = high - low
+        mf_multiplier = np.divide(
+            (close - low) - (high - close), high_low_diff,
+            out=np.zeros(period), where=high_low_diff != 0
+        )
+        mf_multiplier[np.isnan(mf_multiplier)] = 0
+        
+        volume_sum = volume.sum()
+        if volume_sum == 0:
+            return None
+        
+        cmf = (mf_multiplier * volume).sum() / volume_sum
+        
+        return cmf if not np.isnan(cmf) else None
+    except Exception as e:
+        print(f"Error calculating CMF: {str(e)}")
+        return None
+
+
+def calculate_cmf_series(df, period=21):
+    """
+    Calculate Chaikin Money Flow (CMF) for every bar
+    
+    Args:
+        df: DataFrame with High, Low, Close, Volume columns
+        period: CMF period (default: 21)
+    
+    Returns:
+        Series: CMF values (NaN until the first full window)
+    """
+    if len(df) < period:
+        return None
+    
     try:
         # Money Flow Multiplier = [(Close - Low) - (High - Close)] / (High - Low)
         high_low_diff = df['High'] - df['Low']
@@ -332,9 +382,7 @@ def calculate_cmf(df, period=21):
         # Avoid division by zero
         cmf_denominator = cmf_denominator.replace(0, np.nan)
         
-        cmf = cmf_numerator / cmf_denominator
-        
-        return cmf.iloc[-1] if not cmf.empty and not pd.isna(cmf.iloc[-1]) else None
+        return cmf_numerator / cmf_denominator
     except Exception as e:
         print(f"Error calculating CMF: {str(e)}")
         return None
@@ -356,18 +404,8 @@ def calculate_macd(series, fast=12, slow=26, signal=9):
     if len(series) < slow + signal:
         return None, None, None
     
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-    
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram = macd_line - signal_line
-    
-    return (
-        macd_line.iloc[-1] if not macd_line.empty else None,
-        signal_line.iloc[-1] if not signal_line.empty else None,
-        histogram.iloc[-1] if not histogram.empty else None
-    )
+    # Fast, slow and signal EMAs fused into one pass over the prices
+    return macd_latest(series.to_numpy(dtype=np.float64), fast, slow, signal)
 
 
 def calculate_momentum(series, period=10):
@@ -384,7 +422,7 @@ def calculate_momentum(series, period=10):
     if len(series) < period + 1:
         return None
     
-    momentum = series.iloc[-1] - series.iloc[-(period + 1)]
+    momentum = series.iat[-1] - series.iat[-(period + 1)]
     
     return momentum
 
@@ -403,8 +441,8 @@ def calculate_roc(series, period=10):
     if len(series) < period + 1:
         return None
     
-    current = series.iloc[-1]
-    previous = series.iloc[-(period + 1)]
+    current = series.iat[-1]
+    previous = series.iat[-(period + 1)]
     
     if previous == 0:
         return None
@@ -427,15 +465,90 @@ def calculate_obv(df):
     if len(df) < 2:
         return None
     
-    obv = pd.Series(index=df.index, dtype=float)
-    obv.iloc[0] = df['Volume'].iloc[0]
+    close = df['Close'].to_numpy(dtype=np.float64)
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+    
+    # +1 / -1 / 0 per bar (a NaN comparison counts as unchanged)
+    direction = np.nan_to_num(np.sign(np.diff(close)))
+    
+    # Unchanged bars add nothing, even when their volume is missing
+    signed_volume = np.where(direction != 0, direction * volume[1:], 0.0)
+    
+    obv = np.empty(len(df))
+    obv[0] = volume[0]
+    obv[1:] = volume[0] + np.cumsum(signed_volume)
+    
+    return pd.Series(obv, index=df.index)
+
+
+def required_bars(rsi_period=14, bb_period=20, atr_period=14, adx_period=14, stoch_period=14,
+                  ema_period=20, sma_period=200, vwap_lookback=20, volume_period=20,
+                  ema_tolerance=1e-10):
+    """
+    Number of trailing bars that determine the latest value of every indicator
+    
+    Window indicators read only their last window (ADX reads two: DX is itself
+    averaged over DI windows). The EMA depends on all history, but bars older
+    than the returned length carry less than `ema_tolerance` of its weight.
+    
+    Args:
+        *_period / vwap_lookback: Indicator parameters
+        ema_tolerance: Maximum EMA weight of the discarded history
+    
+    Returns:
+        Integer: Number of bars
+    """
+    return max(
+        rsi_period + 1, bb_period, atr_period + 1, 2 * adx_period, stoch_period,
+        _ema_bars(ema_period, ema_tolerance), sma_period, vwap_lookback, volume_period + 1
+    )
+
+
+def calculate_indicator_matrix(close, high, low, volume, rsi_period=14, bb_period=20, bb_std=2,
+                               atr_period=14, adx_period=14, stoch_period=14, ema_period=20,
+                               sma_period=200, vwap_lookback=20, volume_period=20):
+    """
+    Calculate latest price, change and all scanner indicators for many sectors at once
+    
+    Inputs are 2D arrays of shape (n_sectors, n_bars), right-aligned on the
+    latest bar and left-padded with NaN (see data_loader.panel_to_array).
+    The math runs in the JIT-compiled kernels of indicators_numba, looping
+    over sectors in parallel.
+    
+    Args:
+        close: Close prices, shape (n_sectors, n_bars)
+        high: High prices, shape (n_sectors, n_bars)
+        low: Low prices, shape (n_sectors, n_bars)
+        volume: Volumes, shape (n_sectors, n_bars)
+        rsi_period: RSI period (default: 14)
+        bb_period: Bollinger Bands period (default: 20)
+        bb_std: Bollinger Bands standard deviation multiplier (default: 2)
+        atr_period: ATR period (default: 14)
+        adx_period: ADX period (default: 14)
+        stoch_period: Stochastic period (default: 14)
+        ema_period: EMA period (default: 20)
+        sma_period: SMA period (default: 200)
+        vwap_lookback: VWAP lookback (default: 20)
+        volume_period: Average volume period for the volume ratio (default: 20)
+    
+    Returns:
+        Dictionary of arrays keyed by INDICATOR_COLUMNS
+        (one value per sector, NaN where unavailable)
+    """
+    # Only the trailing bars that can affect the latest values reach the kernels
+    n_bars = required_bars(
+        rsi_period, bb_period, atr_period, adx_period, stoch_period,
+        ema_period, sma_period, vwap_lookback, volume_period
+    )
     
-    for i in range(1, len(df)):
-        if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-            obv.iloc[i] = obv.iloc[i-1] + df['Volume'].iloc[i]
-        elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-            obv.iloc[i] = obv.iloc[i-1] - df['Volume'].iloc[i]
-        else:
-            obv.iloc[i] = obv.iloc[i-1]
+    matrix = indicator_matrix(
+        np.ascontiguousarray(close[:, -n_bars:], dtype=KERNEL_DTYPE),
+        np.ascontiguousarray(high[:, -n_bars:], dtype=KERNEL_DTYPE),
+        np.ascontiguousarray(low[:, -n_bars:], dtype=KERNEL_DTYPE),
+        np.ascontiguousarray(volume[:, -n_bars:], dtype=KERNEL_DTYPE),
+        rsi_period, bb_period, float(bb_std), atr_period,
+        adx_period, stoch_period, ema_period, sma_period,
+        vwap_lookback, volume_period
+    )
     
-    return obv
+    return {name: matrix[:, i] for i, name in enumerate(INDICATOR_COLUMNS)}
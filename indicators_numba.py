@@ -0,0 +1,714 @@
+"""
+Numba Indicator Kernels
+JIT-compiled indicator math operating on stacked NumPy arrays
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    
+    # Compiled kernels widen float32 loads into float64 accumulators
+    KERNEL_DTYPE = np.float32
+except ImportError:
+    # Numba is optional: run the same kernels as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+    
+    # As plain Python, sums of float32 scalars would stay float32
+    KERNEL_DTYPE = np.float64
+
+# Indicator periods are ordinary runtime arguments rather than constants baked
+# into per-period kernel copies: a full 19-sector indicator_matrix or
+# trend_matrix call already runs in ~0.2 ms, mostly thread dispatch, so one
+# compiled (and disk-cached) kernel serves every period setting.
+
+# Column order of the matrix returned by indicator_matrix()
+INDICATOR_COLUMNS = (
+    'price', 'change', 'rsi', 'bb_width', 'bb_position', 'atr', 'adx',
+    'stoch', 'ema', 'sma', 'vwap', 'volume_ratio'
+)
+
+
+@njit(cache=True)
+def _first_valid(x):
+    """Index of the first non-NaN value (start of a left-padded row)"""
+    for i in range(x.shape[0]):
+        if not np.isnan(x[i]):
+            return i
+    return x.shape[0]
+
+
+@njit(cache=True)
+def _rsi(close, start, period):
+    """Latest RSI from simple averages of gains/losses over `period` changes"""
+    n = close.shape[0]
+    if n - start < period + 1:
+        return np.nan
+    
+    gain = 0.0
+    loss = 0.0
+    for i in range(n - period, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain += delta
+        elif delta < 0:
+            loss -= delta
+    
+    if loss == 0:
+        return 100.0 if gain > 0 else np.nan
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+@njit(cache=True)
+def _bb(close, start, period, std_dev):
+    """Latest Bollinger Band width and position (sample std, like pandas)"""
+    n = close.shape[0]
+    if n - start < period:
+        return np.nan, np.nan
+    
+    total = 0.0
+    for i in range(n - period, n):
+        total += close[i]
+    middle = total / period
+    
+    sq_dev = 0.0
+    for i in range(n - period, n):
+        sq_dev += (close[i] - middle) ** 2
+    std = np.sqrt(sq_dev / (period - 1))
+    
+    upper = middle + std * std_dev
+    lower = middle - std * std_dev
+    width = (upper - lower) / middle * 100 if middle != 0 else np.nan
+    position = (close[n - 1] - lower) / (upper - lower) * 100 if upper != lower else np.nan
+    return width, position
+
+
+@njit(cache=True)
+def _true_range(high, low, close, i, start):
+    """True range of bar i (high - low on the first bar of the row)"""
+    tr = high[i] - low[i]
+    if i > start:
+        # fmax skips NaN terms, like a row-wise pandas max
+        tr = np.fmax(tr, np.fmax(abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])))
+    return tr
+
+
+@njit(cache=True)
+def _atr(high, low, close, start, period):
+    """Latest ATR (simple average of true range)"""
+    n = close.shape[0]
+    if n - start < period + 1:
+        return np.nan
+    
+    total = 0.0
+    for i in range(n - period, n):
+        total += _true_range(high, low, close, i, start)
+    return total / period
+
+
+@njit(cache=True)
+def _adx(high, low, close, start, period):
+    """Latest ADX: simple average of DX over the last `period` bars"""
+    n = close.shape[0]
+    # Every DX in the final window needs a full window of directional movement
+    if n - start < 2 * period:
+        return np.nan
+    
+    dx_total = 0.0
+    for j in range(n - period, n):
+        tr_sum = 0.0
+        plus_dm_sum = 0.0
+        minus_dm_sum = 0.0
+        for i in range(j - period + 1, j + 1):
+            tr_sum += _true_range(high, low, close, i, start)
+            plus_dm_sum += max(high[i] - high[i - 1], 0.0)
+            minus_dm_sum += max(low[i - 1] - low[i], 0.0)
+        
+        if tr_sum == 0:
+            return np.nan
+        plus_di = 100 * plus_dm_sum / tr_sum
+        minus_di = 100 * minus_dm_sum / tr_sum
+        if plus_di + minus_di == 0:
+            return np.nan
+        dx_total += 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+    
+    return dx_total / period
+
+
+@njit(cache=True)
+def _stoch(high, low, close, start, period):
+    """Latest Stochastic %K"""
+    n = close.shape[0]
+    if n - start < period:
+        return np.nan
+    
+    low_min = low[n - period]
+    high_max = high[n - period]
+    for i in range(n - period + 1, n):
+        low_min = min(low_min, low[i])
+        high_max = max(high_max, high[i])
+    
+    if high_max == low_min:
+        return np.nan
+    return 100 * (close[n - 1] - low_min) / (high_max - low_min)
+
+
+@njit(cache=True)
+def _ema(close, start, period):
+    """Latest EMA (seeded with the first bar, like pandas adjust=False)"""
+    n = close.shape[0]
+    if n - start < period:
+        return np.nan
+    
+    alpha = 2.0 / (period + 1)
+    ema = close[start]
+    for i in range(start + 1, n):
+        ema = alpha * close[i] + (1 - alpha) * ema
+    return ema
+
+
+@njit(cache=True)
+def _sma(close, start, period):
+    """Latest simple moving average"""
+    n = close.shape[0]
+    if n - start < period:
+        return np.nan
+    
+    total = 0.0
+    for i in range(n - period, n):
+        total += close[i]
+    return total / period
+
+
+@njit(cache=True)
+def _change(close, start):
+    """Latest one-bar percentage change"""
+    n = close.shape[0]
+    if n - start < 2 or close[n - 2] == 0:
+        return np.nan
+    return (close[n - 1] - close[n - 2]) / close[n - 2] * 100
+
+
+@njit(cache=True)
+def _vwap(high, low, close, volume, start, lookback):
+    """Volume weighted typical price over the last `lookback` bars"""
+    n = close.shape[0]
+    if n - start < lookback:
+        return np.nan
+    
+    weighted = 0.0
+    total_volume = 0.0
+    for i in range(n - lookback, n):
+        weighted += (high[i] + low[i] + close[i]) / 3 * volume[i]
+        total_volume += volume[i]
+    
+    if total_volume == 0:
+        return np.nan
+    return weighted / total_volume
+
+
+@njit(cache=True)
+def _volume_ratio(volume, start, period):
+    """Latest volume relative to the average of the last `period` bars"""
+    n = volume.shape[0]
+    if n - start < period + 1:
+        return np.nan
+    
+    total = 0.0
+    for i in range(n - period, n):
+        total += volume[i]
+    
+    if total == 0:
+        return np.nan
+    return volume[n - 1] / (total / period)
+
+
+@njit(cache=True, parallel=True)
+def indicator_matrix(close, high, low, volume, rsi_period, bb_period, bb_std, atr_period,
+                     adx_period, stoch_period, ema_period, sma_period, vwap_lookback,
+                     volume_period):
+    """
+    Calculate the latest value of every indicator for every sector
+    
+    Args:
+        close: Close prices, shape (n_sectors, n_bars), left-padded with NaN
+        high: High prices, same shape as close
+        low: Low prices, same shape as close
+        volume: Volumes, same shape as close
+        *_period / bb_std / vwap_lookback: Indicator parameters
+    
+    Returns:
+        ndarray of shape (n_sectors, len(INDICATOR_COLUMNS)), NaN where unavailable
+    """
+    n_sectors = close.shape[0]
+    out = np.full((n_sectors, 12), np.nan)
+    
+    for s in prange(n_sectors):
+        c = close[s]
+        h = high[s]
+        l = low[s]
+        v = volume[s]
+        start = _first_valid(c)
+        
+        if start < c.shape[0]:
+            out[s, 0] = c[c.shape[0] - 1]
+        out[s, 1] = _change(c, start)
+        out[s, 2] = _rsi(c, start, rsi_period)
+        bb_width, bb_position = _bb(c, start, bb_period, bb_std)
+        out[s, 3] = bb_width
+        out[s, 4] = bb_position
+        out[s, 5] = _atr(h, l, c, start, atr_period)
+        out[s, 6] = _adx(h, l, c, start, adx_period)
+        out[s, 7] = _stoch(h, l, c, start, stoch_period)
+        out[s, 8] = _ema(c, start, ema_period)
+        out[s, 9] = _sma(c, start, sma_period)
+        out[s, 10] = _vwap(h, l, c, v, start, vwap_lookback)
+        out[s, 11] = _volume_ratio(v, start, volume_period)
+    
+    return out
+
+
+@njit(cache=True)
+def rolling_sum(x, period):
+    """
+    Trailing sum of every full `period` window in one running-sum pass
+    
+    The running sum is Kahan-compensated (as in pandas), so rounding error
+    from values that already left the window does not accumulate.
+    
+    Args:
+        x: 1-D float array (NaN/inf count as missing, like pandas)
+        period: Window length
+    
+    Returns:
+        ndarray like x; NaN until a window holds `period` valid values (like pandas)
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    compensation = 0.0
+    count = 0
+    
+    for i in range(n):
+        if np.isfinite(x[i]):
+            y = x[i] - compensation
+            t = total + y
+            compensation = (t - total) - y
+            total = t
+            count += 1
+        if i >= period and np.isfinite(x[i - period]):
+            y = -x[i - period] - compensation
+            t = total + y
+            compensation = (t - total) - y
+            total = t
+            count -= 1
+            if count == 0:
+                total = 0.0
+                compensation = 0.0
+        if count == period:
+            out[i] = total
+    
+    return out
+
+
+@njit(cache=True)
+def _flat_run(x):
+    """Length of the run of identical finite values ending at every index"""
+    n = x.shape[0]
+    run = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        if np.isfinite(x[i]):
+            run[i] = run[i - 1] + 1 if i > 0 and x[i] == x[i - 1] else 1
+    return run
+
+
+@njit(cache=True)
+def rolling_mean(x, period):
+    """
+    Trailing mean of every full `period` window in one running-sum pass
+    
+    Args:
+        x: 1-D float array (NaN/inf count as missing, like pandas)
+        period: Window length
+    
+    Returns:
+        ndarray like x; NaN until a window holds `period` valid values (like pandas)
+    """
+    out = rolling_sum(x, period) / period
+    
+    # A window of identical values averages to exactly that value (like pandas)
+    run = _flat_run(x)
+    for i in range(x.shape[0]):
+        if run[i] >= period:
+            out[i] = x[i]
+    
+    return out
+
+
+@njit(cache=True)
+def rolling_std(x, period):
+    """
+    Trailing sample standard deviation (ddof=1) of every full `period` window
+    
+    Uses a sliding Welford update (add the new value, remove the old one),
+    which stays stable where a running sum of squares would cancel.
+    
+    Args:
+        x: 1-D float array (NaN/inf count as missing, like pandas)
+        period: Window length
+    
+    Returns:
+        ndarray like x; NaN until a window holds `period` valid values (like pandas)
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    mean = 0.0
+    m2 = 0.0
+    count = 0
+    
+    for i in range(n):
+        if np.isfinite(x[i]):
+            count += 1
+            delta = x[i] - mean
+            mean += delta / count
+            m2 += delta * (x[i] - mean)
+        if i >= period and np.isfinite(x[i - period]):
+            count -= 1
+            if count == 0:
+                mean = 0.0
+                m2 = 0.0
+            else:
+                delta = x[i - period] - mean
+                mean -= delta / count
+                m2 -= delta * (x[i - period] - mean)
+        if count == period and period > 1:
+            out[i] = np.sqrt(max(m2, 0.0) / (period - 1))
+    
+    # A window of identical values has exactly zero spread (like pandas)
+    run = _flat_run(x)
+    for i in range(n):
+        if run[i] >= period and period > 1:
+            out[i] = 0.0
+    
+    return out
+
+
+@njit(cache=True)
+def _ratio(num, den):
+    """num / den with NumPy semantics for a zero denominator (+/-inf, NaN for 0/0)"""
+    if den == 0:
+        if num == 0 or np.isnan(num):
+            return np.nan
+        return np.inf if num > 0 else -np.inf
+    return num / den
+
+
+@njit(cache=True)
+def _directional_series(high, low, close, start, period):
+    """ADX, +DI and -DI for every bar (simple rolling means, like calculate_adx_series)"""
+    n = close.shape[0]
+    tr = np.full(n, np.nan)
+    plus_dm = np.full(n, np.nan)
+    minus_dm = np.full(n, np.nan)
+    
+    for i in range(start, n):
+        tr[i] = _true_range(high, low, close, i, start)
+        if i > start:
+            # maximum keeps a missing move missing (pandas diff() then clip)
+            plus_dm[i] = np.maximum(high[i] - high[i - 1], 0.0)
+            minus_dm[i] = np.maximum(low[i - 1] - low[i], 0.0)
+    
+    atr = rolling_mean(tr, period)
+    plus_avg = rolling_mean(plus_dm, period)
+    minus_avg = rolling_mean(minus_dm, period)
+    
+    plus_di = np.full(n, np.nan)
+    minus_di = np.full(n, np.nan)
+    dx = np.full(n, np.nan)
+    for i in range(n):
+        plus_di[i] = 100 * _ratio(plus_avg[i], atr[i])
+        minus_di[i] = 100 * _ratio(minus_avg[i], atr[i])
+        dx[i] = 100 * _ratio(abs(plus_di[i] - minus_di[i]), plus_di[i] + minus_di[i])
+    
+    return rolling_mean(dx, period), plus_di, minus_di
+
+
+@njit(cache=True)
+def directional_series(high, low, close, period):
+    """
+    ADX, +DI and -DI for every bar of one sector (leading NaN padding skipped)
+    
+    Args:
+        high: 1-D float array of highs
+        low: 1-D float array of lows
+        close: 1-D float array of closes
+        period: ADX period
+    
+    Returns:
+        Tuple of three ndarrays (adx, plus_di, minus_di) like close
+    """
+    # A bar with only a missing close still has a high - low range (like pandas)
+    start = min(_first_valid(high), _first_valid(low), _first_valid(close))
+    return _directional_series(high, low, close, start, period)
+
+
+@njit(cache=True)
+def _cmf_series(high, low, close, volume, start, period):
+    """Chaikin Money Flow for every bar (like calculate_cmf_series)"""
+    n = close.shape[0]
+    mf_volume = np.full(n, np.nan)
+    
+    for i in range(start, n):
+        high_low_diff = high[i] - low[i]
+        multiplier = 0.0
+        if high_low_diff != 0:
+            multiplier = ((close[i] - low[i]) - (high[i] - close[i])) / high_low_diff
+        mf_volume[i] = multiplier * volume[i]
+    
+    numerator = rolling_sum(mf_volume, period)
+    denominator = rolling_sum(volume, period)
+    
+    cmf = np.full(n, np.nan)
+    for i in range(n):
+        if denominator[i] != 0:
+            cmf[i] = numerator[i] / denominator[i]
+    
+    return cmf
+
+
+@njit(cache=True, parallel=True)
+def trend_matrix(close, high, low, volume, adx_period, cmf_period, n_sessions):
+    """
+    Calculate the last `n_sessions` ADX, +DI, -DI and CMF values for every sector
+    
+    Args:
+        close: Close prices, shape (n_sectors, n_bars), left-padded with NaN
+        high: High prices, same shape as close
+        low: Low prices, same shape as close
+        volume: Volumes, same shape as close
+        adx_period: ADX period
+        cmf_period: CMF period
+        n_sessions: Number of trailing sessions to return
+    
+    Returns:
+        Tuple of four ndarrays (adx, plus_di, minus_di, cmf), each of shape
+        (n_sectors, n_sessions), NaN where unavailable
+    """
+    n_sectors = close.shape[0]
+    n_bars = close.shape[1]
+    adx_out = np.full((n_sectors, n_sessions), np.nan)
+    plus_di_out = np.full((n_sectors, n_sessions), np.nan)
+    minus_di_out = np.full((n_sectors, n_sessions), np.nan)
+    cmf_out = np.full((n_sectors, n_sessions), np.nan)
+    
+    tail = min(n_sessions, n_bars)
+    for s in prange(n_sectors):
+        start = _first_valid(close[s])
+        adx, plus_di, minus_di = _directional_series(high[s], low[s], close[s], start, adx_period)
+        cmf = _cmf_series(high[s], low[s], close[s], volume[s], start, cmf_period)
+        
+        adx_out[s, n_sessions - tail:] = adx[n_bars - tail:]
+        plus_di_out[s, n_sessions - tail:] = plus_di[n_bars - tail:]
+        minus_di_out[s, n_sessions - tail:] = minus_di[n_bars - tail:]
+        cmf_out[s, n_sessions - tail:] = cmf[n_bars - tail:]
+    
+    return adx_out, plus_di_out, minus_di_out, cmf_out
+
+
+@njit(cache=True)
+def _ewm_update(mean, weight, value, alpha):
+    """
+    One step of pandas ewm(adjust=False).mean()
+    
+    A NaN value leaves the mean unchanged, but its weight keeps decaying
+    (pandas' default ignore_na=False), so the next valid value counts more.
+    
+    Returns:
+        Tuple: (mean, weight) to carry into the next step
+    """
+    if np.isnan(mean):
+        return value, 1.0
+    
+    weight *= 1 - alpha
+    if np.isnan(value):
+        return mean, weight
+    
+    if mean != value:
+        mean = (weight * mean + alpha * value) / (weight + alpha)
+    return mean, 1.0
+
+
+@njit(cache=True)
+def ema_latest(x, period):
+    """
+    Latest EMA (pandas ewm(span=period, adjust=False)), skipping NaN bars
+    
+    Args:
+        x: 1-D float price array
+        period: EMA span
+    
+    Returns:
+        EMA at the last bar (NaN if x has no valid value)
+    """
+    alpha = 2.0 / (period + 1)
+    ema = np.nan
+    weight = 1.0
+    for i in range(x.shape[0]):
+        ema, weight = _ewm_update(ema, weight, x[i], alpha)
+    return ema
+
+
+@njit(cache=True)
+def macd_latest(x, fast, slow, signal):
+    """
+    Latest MACD line, signal line and histogram in a single pass
+    
+    The fast, slow and signal EMAs (seeded with the first valid bar, like
+    pandas adjust=False) are all advanced together bar by bar; NaN bars are
+    skipped the way ewm() skips them.
+    
+    Args:
+        x: 1-D float price array
+        fast: Fast EMA period
+        slow: Slow EMA period
+        signal: Signal line period
+    
+    Returns:
+        Tuple: (macd_line, signal_line, histogram) at the last bar
+    """
+    alpha_fast = 2.0 / (fast + 1)
+    alpha_slow = 2.0 / (slow + 1)
+    alpha_signal = 2.0 / (signal + 1)
+    
+    ema_fast = np.nan
+    ema_slow = np.nan
+    signal_line = np.nan
+    weight_fast = 1.0
+    weight_slow = 1.0
+    weight_signal = 1.0
+    for i in range(x.shape[0]):
+        ema_fast, weight_fast = _ewm_update(ema_fast, weight_fast, x[i], alpha_fast)
+        ema_slow, weight_slow = _ewm_update(ema_slow, weight_slow, x[i], alpha_slow)
+        signal_line, weight_signal = _ewm_update(signal_line, weight_signal, ema_fast - ema_slow, alpha_signal)
+    
+    macd_line = ema_fast - ema_slow
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit(cache=True)
+def rsi_series(x, period):
+    """
+    RSI for every bar from simple rolling averages of gains and losses
+    
+    Args:
+        x: 1-D float price array
+        period: RSI period
+    
+    Returns:
+        ndarray like x; NaN until the first full window (like calculate_rsi)
+    """
+    n = x.shape[0]
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+    
+    # A missing change counts as neither a gain nor a loss (pandas .where(..., 0))
+    for i in range(1, n):
+        delta = x[i] - x[i - 1]
+        if delta > 0:
+            gains[i] = delta
+        elif delta < 0:
+            losses[i] = -delta
+    
+    avg_gain = rolling_mean(gains, period)
+    avg_loss = rolling_mean(losses, period)
+    
+    rsi = np.full(n, np.nan)
+    for i in range(n):
+        rsi[i] = 100 - 100 / (1 + _ratio(avg_gain[i], avg_loss[i]))
+    
+    return rsi
+
+
+@njit(cache=True, parallel=True)
+def min_max_scale(x, min_val, max_val, target_min, target_max):
+    """
+    Min-max scale every value of x into [target_min, target_max]
+    
+    Args:
+        x: 1-D float array
+        min_val, max_val: Source range
+        target_min, target_max: Target range
+    
+    Returns:
+        float64 ndarray like x; NaN stays NaN, a flat range maps to the midpoint
+    """
+    n = x.shape[0]
+    out = np.empty(n)
+    span = max_val - min_val
+    scale = target_max - target_min
+    
+    for i in prange(n):
+        if np.isnan(x[i]):
+            out[i] = np.nan
+        elif span == 0:
+            out[i] = target_min + scale / 2
+        else:
+            out[i] = (x[i] - min_val) / span * scale + target_min
+    
+    return out
+
+
+@njit(cache=True, parallel=True)
+def z_scores(x, mean, std):
+    """
+    Z-score of every value of x
+    
+    Args:
+        x: 1-D float array
+        mean, std: Mean and standard deviation of the dataset
+    
+    Returns:
+        float64 ndarray like x; all NaN when std is zero or NaN
+    """
+    n = x.shape[0]
+    out = np.empty(n)
+    valid = std != 0 and not np.isnan(std)
+    
+    for i in prange(n):
+        out[i] = (x[i] - mean) / std if valid else np.nan
+    
+    return out
+
+
+def warm_up():
+    """
+    Compile every public kernel for the argument types the app passes
+    
+    Kernels are cached on disk (cache=True), so only the very first run
+    compiles; later processes just load them. Calling this up front keeps
+    that cost out of the first table render. This covers the helpers in
+    utils.py too, and is used instead of ahead-of-time compilation
+    (numba.pycc is deprecated and would need a separate build step).
+    """
+    panel = np.zeros((1, 64), dtype=KERNEL_DTYPE)
+    
+    indicator_matrix(panel, panel, panel, panel, 14, 20, 2.0, 14, 14, 14, 20, 200, 20, 20)
+    trend_matrix(panel, panel, panel, panel, 14, 21, 4)
+    
+    # Series.to_numpy() may hand out read-only views, which numba types separately
+    readonly = np.zeros(64)
+    readonly.flags.writeable = False
+    for series in (np.zeros(64), readonly):
+        rolling_mean(series, 20)
+        rolling_std(series, 20)
+        rsi_series(series, 14)
+        ema_latest(series, 20)
+        macd_latest(series, 12, 26, 9)
+        directional_series(series, series, series, 14)
+        min_max_scale(series, 0.0, 1.0, 0.0, 100.0)
+        z_scores(series, 0.0, 1.0)
@@ -0,0 +1,444 @@
+"""
+Indicator Tests
+Checks the NumPy/Numba indicators against the original pandas implementations
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+from indicators_numba import (
+    directional_series, ema_latest, macd_latest, rolling_mean, rolling_std, rsi_series,
+    trend_matrix, INDICATOR_COLUMNS, KERNEL_DTYPE
+)
+
+
+# ---------------------------------------------------------------------------
+# pandas reference implementations (the formulas the optimized code replaced)
+# ---------------------------------------------------------------------------
+
+def _last(series):
+    """Last value of a reference series, None when it is NaN"""
+    value = series.iloc[-1]
+    return None if pd.isna(value) else value
+
+
+def _true_range(df):
+    prev_close = df['Close'].shift()
+    return pd.concat([
+        df['High'] - df['Low'], (df['High'] - prev_close).abs(), (df['Low'] - prev_close).abs()
+    ], axis=1).max(axis=1)
+
+
+def ref_rsi(series, period=14):
+    delta = series.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def ref_bollinger_bands(series, period=20, std_dev=2):
+    middle = series.rolling(window=period).mean()
+    std = series.rolling(window=period).std()
+    upper = middle + std * std_dev
+    lower = middle - std * std_dev
+    return middle, upper, lower, (upper - lower) / middle * 100, (series - lower) / (upper - lower) * 100
+
+
+def ref_atr(df, period=14):
+    return _last(_true_range(df).rolling(window=period).mean())
+
+
+def ref_adx_series(df, period=14):
+    plus_dm = df['High'].diff().clip(lower=0)
+    minus_dm = (-df['Low'].diff()).clip(lower=0)
+    atr = _true_range(df).rolling(window=period).mean()
+    plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr)
+    minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr)
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return dx.rolling(window=period).mean(), plus_di, minus_di
+
+
+def ref_stochastic(df, period=14):
+    low_min = df['Low'].rolling(window=period).min()
+    high_max = df['High'].rolling(window=period).max()
+    return _last(100 * (df['Close'] - low_min) / (high_max - low_min))
+
+
+def ref_vwap(df, lookback=20):
+    tail = df.tail(lookback)
+    typical_price = (tail['High'] + tail['Low'] + tail['Close']) / 3
+    vwap = (typical_price * tail['Volume']).sum() / tail['Volume'].sum()
+    return None if pd.isna(vwap) else vwap
+
+
+def ref_sma(series, period=200):
+    return _last(series.rolling(window=period).mean())
+
+
+def ref_ema(series, period=20):
+    return _last(series.ewm(span=period, adjust=False).mean())
+
+
+def ref_macd(series, fast=12, slow=26, signal=9):
+    macd_line = series.ewm(span=fast, adjust=False).mean() - series.ewm(span=slow, adjust=False).mean()
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    return macd_line.iloc[-1], signal_line.iloc[-1], (macd_line - signal_line).iloc[-1]
+
+
+def ref_cmf_series(df, period=21):
+    high_low_diff = (df['High'] - df['Low']).replace(0, np.nan)
+    multiplier = (((df['Close'] - df['Low']) - (df['High'] - df['Close'])) / high_low_diff).fillna(0)
+    numerator = (multiplier * df['Volume']).rolling(window=period).sum()
+    return numerator / df['Volume'].rolling(window=period).sum().replace(0, np.nan)
+
+
+def ref_obv(df):
+    obv = pd.Series(index=df.index, dtype=float)
+    obv.iloc[0] = df['Volume'].iloc[0]
+    for i in range(1, len(df)):
+        if df['Close'].iloc[i] > df['Close'].iloc[i - 1]:
+            obv.iloc[i] = obv.iloc[i - 1] + df['Volume'].iloc[i]
+        elif df['Close'].iloc[i] < df['Close'].iloc[i - 1]:
+            obv.iloc[i] = obv.iloc[i - 1] - df['Volume'].iloc[i]
+        else:
+            obv.iloc[i] = obv.iloc[i - 1]
+    return obv
+
+
+# ---------------------------------------------------------------------------
+# Test data
+# ---------------------------------------------------------------------------
+
+def make_ohlcv(n=250, seed=0):
+    """Random-walk OHLCV bars on a business-day index"""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, n)),
+        'High': close * (1 + np.abs(rng.normal(0, 0.005, n))),
+        'Low': close * (1 - np.abs(rng.normal(0, 0.005, n))),
+        'Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, n).astype(float),
+    }, index=pd.bdate_range(end='2026-10-14', periods=n))
+
+
+def with_gaps(df, columns=('High', 'Low', 'Close', 'Volume'), seed=1):
+    """Copy of df with a few missing bars scattered through the given columns"""
+    df = df.copy()
+    rng = np.random.default_rng(seed)
+    for column in columns:
+        df.loc[df.index[rng.choice(len(df) - 1, 4, replace=False)], column] = np.nan
+    return df
+
+
+def flat_tail(df, bars=25, price=100.0):
+    """Copy of df whose last `bars` bars are identical (a zero-range window)"""
+    df = df.copy()
+    df.iloc[-bars:, df.columns.get_indexer(['Open', 'High', 'Low', 'Close'])] = price
+    return df
+
+
+def assert_close(actual, expected, rtol=1e-9, atol=None):
+    """Scalars/tuples/arrays agree, with None and NaN treated as the same"""
+    if isinstance(expected, tuple):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_close(a, e, rtol, atol)
+        return
+    actual = np.nan if actual is None else actual
+    expected = np.nan if expected is None else expected
+    np.testing.assert_allclose(
+        np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64),
+        rtol=rtol, atol=rtol if atol is None else atol, equal_nan=True
+    )
+
+
+@pytest.fixture(params=[0, 1, 2])
+def ohlcv(request):
+    return make_ohlcv(seed=request.param)
+
+
+# ---------------------------------------------------------------------------
+# Scalar indicators
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize('period', [5, 20, 50])
+def test_ema_matches_pandas(ohlcv, period):
+    assert_close(indicators.calculate_ema(ohlcv['Close'], period), ref_ema(ohlcv['Close'], period))
+
+
+def test_ema_skips_nan_gaps(ohlcv):
+    close = with_gaps(ohlcv)['Close']
+    assert_close(indicators.calculate_ema(close), ref_ema(close))
+
+
+def test_macd_matches_pandas(ohlcv):
+    assert_close(indicators.calculate_macd(ohlcv['Close']), ref_macd(ohlcv['Close']))
+
+
+def test_macd_skips_nan_gaps(ohlcv):
+    close = with_gaps(ohlcv)['Close']
+    close.iloc[:5] = np.nan
+    assert_close(indicators.calculate_macd(close), ref_macd(close))
+
+
+@pytest.mark.parametrize('lookback', [1, 20, 60])
+def test_vwap_matches_pandas(ohlcv, lookback):
+    assert_close(indicators.calculate_vwap(ohlcv, lookback), ref_vwap(ohlcv, lookback))
+
+
+def test_vwap_skips_nan_gaps(ohlcv):
+    df = with_gaps(ohlcv.tail(30))
+    assert_close(indicators.calculate_vwap(df), ref_vwap(df))
+
+
+def test_vwap_zero_volume_is_none(ohlcv):
+    df = ohlcv.assign(Volume=0.0)
+    assert indicators.calculate_vwap(df) is None
+
+
+@pytest.mark.parametrize('period', [1, 20, 200])
+def test_sma_matches_pandas(ohlcv, period):
+    assert_close(indicators.calculate_sma(ohlcv['Close'], period), ref_sma(ohlcv['Close'], period))
+
+
+def test_sma_flat_window_is_exact(ohlcv):
+    close = flat_tail(ohlcv)['Close']
+    assert indicators.calculate_sma(close, 20) == ref_sma(close, 20) == 100.0
+
+
+def test_sma_nan_in_window_is_none(ohlcv):
+    close = ohlcv['Close'].copy()
+    close.iloc[-3] = np.nan
+    assert indicators.calculate_sma(close, 20) is None
+    assert ref_sma(close, 20) is None
+
+
+@pytest.mark.parametrize('period', [1, 14, 30])
+def test_atr_matches_pandas(ohlcv, period):
+    assert_close(indicators.calculate_atr(ohlcv, period), ref_atr(ohlcv, period))
+
+
+@pytest.mark.parametrize('transform', [with_gaps, flat_tail])
+def test_atr_edge_cases(ohlcv, transform):
+    df = transform(ohlcv)
+    assert_close(indicators.calculate_atr(df), ref_atr(df))
+
+
+@pytest.mark.parametrize('period', [5, 14])
+def test_stochastic_matches_pandas(ohlcv, period):
+    assert_close(indicators.calculate_stochastic(ohlcv, period), ref_stochastic(ohlcv, period))
+
+
+@pytest.mark.parametrize('transform', [with_gaps, flat_tail])
+def test_stochastic_edge_cases(ohlcv, transform):
+    df = transform(ohlcv)
+    assert_close(indicators.calculate_stochastic(df), ref_stochastic(df))
+
+
+def test_stochastic_flat_window_is_none(ohlcv):
+    assert indicators.calculate_stochastic(flat_tail(ohlcv)) is None
+
+
+@pytest.mark.parametrize('period', [10, 21])
+def test_cmf_matches_pandas(ohlcv, period):
+    assert_close(indicators.calculate_cmf(ohlcv, period), _last(ref_cmf_series(ohlcv, period)))
+    assert_close(indicators.calculate_cmf_series(ohlcv, period), ref_cmf_series(ohlcv, period).to_numpy())
+
+
+@pytest.mark.parametrize('transform', [with_gaps, flat_tail])
+def test_cmf_edge_cases(ohlcv, transform):
+    df = transform(ohlcv)
+    assert_close(indicators.calculate_cmf(df), _last(ref_cmf_series(df)))
+
+
+def test_cmf_zero_volume_is_none(ohlcv):
+    assert indicators.calculate_cmf(ohlcv.assign(Volume=0.0)) is None
+
+
+@pytest.mark.parametrize('transform', [lambda df: df, with_gaps, flat_tail])
+def test_obv_matches_loop(ohlcv, transform):
+    df = transform(ohlcv.head(80))
+    assert_close(indicators.calculate_obv(df).to_numpy(), ref_obv(df).to_numpy())
+
+
+@pytest.mark.parametrize('transform', [lambda df: df, with_gaps])
+def test_rsi_matches_pandas(ohlcv, transform):
+    close = transform(ohlcv)['Close']
+    assert_close(indicators.calculate_rsi(close).to_numpy(), ref_rsi(close).to_numpy())
+
+
+@pytest.mark.parametrize('transform', [lambda df: df, with_gaps, flat_tail])
+def test_bollinger_bands_match_pandas(ohlcv, transform):
+    close = transform(ohlcv)['Close']
+    actual = indicators.calculate_bollinger_bands(close)
+    expected = ref_bollinger_bands(close)
+    for a, e in zip(actual, expected):
+        assert_close(a.to_numpy(), e.to_numpy())
+
+
+def test_bollinger_bands_flat_window(ohlcv):
+    middle, upper, lower, _, bb_position = indicators.calculate_bollinger_bands(flat_tail(ohlcv)['Close'])
+    assert middle.iloc[-1] == upper.iloc[-1] == lower.iloc[-1] == 100.0
+    assert np.isnan(bb_position.iloc[-1])
+
+
+@pytest.mark.parametrize('transform', [lambda df: df, with_gaps, flat_tail])
+def test_adx_matches_pandas(ohlcv, transform):
+    df = transform(ohlcv)
+    actual = indicators.calculate_adx_series(df)
+    for a, e in zip(actual, ref_adx_series(df)):
+        assert_close(a.to_numpy(), e.to_numpy())
+    assert_close(indicators.calculate_adx(df), _last(ref_adx_series(df)[0]))
+
+
+@pytest.mark.parametrize('func, args, min_bars', [
+    (indicators.calculate_ema, ('Close', 20), 20),
+    (indicators.calculate_sma, ('Close', 200), 200),
+    (indicators.calculate_rsi, ('Close', 14), 15),
+    (indicators.calculate_atr, (None, 14), 15),
+    (indicators.calculate_adx, (None, 14), 15),
+    (indicators.calculate_stochastic, (None, 14), 14),
+    (indicators.calculate_vwap, (None, 20), 20),
+    (indicators.calculate_cmf, (None, 21), 21),
+])
+def test_short_history_is_none(func, args, min_bars):
+    column, period = args
+    df = make_ohlcv(min_bars - 1)
+    data = df if column is None else df[column]
+    assert func(data, period) is None
+
+
+def test_short_history_macd_and_bands():
+    close = make_ohlcv(34)['Close']
+    assert indicators.calculate_macd(close) == (None, None, None)
+    assert indicators.calculate_bollinger_bands(close.head(19)) == (None,) * 5
+    assert indicators.calculate_obv(make_ohlcv(1)) is None
+
+
+# ---------------------------------------------------------------------------
+# Numba kernels
+# ---------------------------------------------------------------------------
+
+def _kernel_input(n=200, seed=0):
+    """Random walk with NaN/inf holes, flat runs and a large offset"""
+    rng = np.random.default_rng(seed)
+    x = 1e4 + np.cumsum(rng.normal(0, 1, n)) * 50
+    x[40:70] = 100.0
+    x[rng.choice(n, 3, replace=False)] = np.nan
+    x[150] = np.inf
+    return x
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('period', [1, 2, 20])
+def test_rolling_kernels_match_pandas(seed, period):
+    x = _kernel_input(seed=seed)
+    series = pd.Series(x).replace(np.inf, np.nan)
+    # Running sums carry rounding error on the scale of the prices themselves
+    atol = 1e-9 * series.abs().max()
+    assert_close(rolling_mean(x, period), series.rolling(period).mean().to_numpy(), atol=atol)
+    assert_close(rolling_std(x, period), series.rolling(period).std().to_numpy(), atol=atol)
+
+
+def test_rolling_kernels_flat_window_is_exact():
+    x = np.r_[np.linspace(90, 130, 57), np.full(20, 100.0)]
+    assert rolling_mean(x, 20)[-1] == 100.0
+    assert rolling_std(x, 20)[-1] == 0.0
+
+
+@pytest.mark.parametrize('period', [5, 20])
+def test_ema_kernels_match_pandas(ohlcv, period):
+    close = with_gaps(ohlcv)['Close']
+    values = close.to_numpy()
+    assert_close(ema_latest(values, period), ref_ema(close, period))
+    assert_close(macd_latest(values, period, 2 * period, 9), ref_macd(close, period, 2 * period, 9))
+    assert np.isnan(ema_latest(np.full(5, np.nan), period))
+
+
+def test_rsi_kernel_matches_pandas():
+    series = pd.Series(_kernel_input()).replace(np.inf, np.nan)
+    assert_close(rsi_series(series.to_numpy(), 14), ref_rsi(series).to_numpy())
+
+
+def test_directional_kernel_matches_pandas(ohlcv):
+    df = ohlcv.copy()
+    df.iloc[:10] = np.nan
+    adx, plus_di, minus_di = directional_series(
+        df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), 14
+    )
+    expected = ref_adx_series(df.iloc[10:])
+    for a, e in zip((adx, plus_di, minus_di), expected):
+        assert np.isnan(a[:10]).all()
+        assert_close(a[10:], e.to_numpy())
+
+
+def _panel(frames):
+    """Stack frames into right-aligned, NaN-padded (n_sectors, n_bars) arrays"""
+    n_bars = max(len(df) for df in frames)
+    arrays = {}
+    for column in ('Close', 'High', 'Low', 'Volume'):
+        panel = np.full((len(frames), n_bars), np.nan)
+        for i, df in enumerate(frames):
+            panel[i, n_bars - len(df):] = df[column].to_numpy()
+        arrays[column] = panel
+    return arrays
+
+
+def _kernel_precision(frames):
+    """Round inputs to the kernel dtype so both sides see the same prices"""
+    rounded = [df.astype(KERNEL_DTYPE).astype(np.float64) for df in frames]
+    rtol = 1e-9 if KERNEL_DTYPE == np.float64 else 1e-5
+    return rounded, rtol
+
+
+def test_indicator_matrix_matches_pandas():
+    frames, rtol = _kernel_precision([
+        make_ohlcv(250, seed=0), make_ohlcv(126, seed=1), flat_tail(make_ohlcv(60, seed=2)),
+        make_ohlcv(25, seed=3), make_ohlcv(10, seed=4),
+    ])
+    arrays = _panel(frames)
+    matrix = indicators.calculate_indicator_matrix(
+        arrays['Close'], arrays['High'], arrays['Low'], arrays['Volume']
+    )
+    assert set(matrix) == set(INDICATOR_COLUMNS)
+
+    for i, df in enumerate(frames):
+        close = df['Close']
+        _, _, _, bb_width, bb_position = ref_bollinger_bands(close)
+        volume_ratio = df['Volume'].iloc[-1] / df['Volume'].tail(20).mean() if len(df) > 20 else None
+        expected = {
+            'price': close.iloc[-1],
+            'change': close.pct_change().iloc[-1] * 100,
+            'rsi': _last(ref_rsi(close)),
+            'bb_width': _last(bb_width),
+            'bb_position': _last(bb_position),
+            'atr': ref_atr(df),
+            'adx': _last(ref_adx_series(df)[0]),
+            'stoch': ref_stochastic(df),
+            'ema': ref_ema(close) if len(df) >= 20 else None,
+            'sma': ref_sma(close),
+            'vwap': ref_vwap(df) if len(df) >= 20 else None,
+            'volume_ratio': volume_ratio,
+        }
+        for name, value in expected.items():
+            assert_close(matrix[name][i], value, rtol)
+
+
+def test_trend_matrix_matches_pandas():
+    frames, rtol = _kernel_precision([
+        make_ohlcv(250, seed=0), flat_tail(make_ohlcv(126, seed=1)), make_ohlcv(30, seed=2),
+    ])
+    arrays = _panel(frames)
+    n_sessions = 5
+    adx, plus_di, minus_di, cmf = trend_matrix(
+        *(np.ascontiguousarray(arrays[c], dtype=KERNEL_DTYPE) for c in ('Close', 'High', 'Low', 'Volume')),
+        14, 21, n_sessions
+    )
+
+    for i, df in enumerate(frames):
+        expected = ref_adx_series(df) + (ref_cmf_series(df),)
+        for actual, series in zip((adx, plus_di, minus_di, cmf), expected):
+            assert_close(actual[i], series.to_numpy()[-n_sessions:], rtol)
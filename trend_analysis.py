@@ -5,7 +5,30 @@ Functions for analyzing trend indicators over N sessions
 
 import pandas as pd
 import numpy as np
-from indicators import calculate_adx_series, calculate_cmf
+from indicators import calculate_adx_series, calculate_cmf_series
+from indicators_numba import trend_matrix, KERNEL_DTYPE
+
+# Remark labels produced by calculate_trend_indicators
+REMARK_BULLISH = "🟢 Bullish"
+REMARK_BEARISH = "🔴 Bearish"
+REMARK_BULLISH_BIAS = "🟡 Bullish Bias"
+REMARK_BEARISH_BIAS = "🟠 Bearish Bias"
+REMARK_SIDEWAY = "⚪ Sideway"
+
+BULLISH_REMARKS = frozenset({REMARK_BULLISH})
+BEARISH_REMARKS = frozenset({REMARK_BEARISH})
+NEUTRAL_REMARKS = frozenset({REMARK_SIDEWAY})
+
+# Net vote of the three trend signals (each +1 bullish / -1 bearish / 0) -> remark
+REMARK_BY_VOTE = {
+    3: REMARK_BULLISH, 2: REMARK_BULLISH, 1: REMARK_BULLISH_BIAS,
+    0: REMARK_SIDEWAY,
+    -1: REMARK_BEARISH_BIAS, -2: REMARK_BEARISH, -3: REMARK_BEARISH
+}
+
+# Display labels for the ADX and CMF trend votes
+ADX_TREND_LABELS = {1: ("🟢", "Increasing"), 0: ("⚪", "Flat"), -1: ("🔴", "Weakening")}
+CMF_TREND_LABELS = {1: ("🟢", "Accumulation"), 0: ("⚪", "Flat"), -1: ("🔴", "Distribution")}
 
 
 def calculate_trend_indicators(df, sector_name, n_sessions=4):
@@ -30,139 +53,160 @@ def calculate_trend_indicators(df, sector_name, n_sessions=4):
         if adx_series is None:
             return None
         
-        # Get last N sessions
-        recent_adx = adx_series.tail(n_sessions)
-        recent_plus_di = plus_di_series.tail(n_sessions)
-        recent_minus_di = minus_di_series.tail(n_sessions)
-        
-        # Current values
-        current_adx = recent_adx.iloc[-1]
-        current_plus_di = recent_plus_di.iloc[-1]
-        current_minus_di = recent_minus_di.iloc[-1]
-        
-        # Normalized ADX (0-100 scale using min-max scaling over N sessions)
-        adx_min = recent_adx.min()
-        adx_max = recent_adx.max()
-        norm_adx = ((current_adx - adx_min) / (adx_max - adx_min) * 100) if adx_max > adx_min else 50.0
-        
-        # ADX Trend (Increasing/Weakening/Flat)
-        adx_trend_value = recent_adx.iloc[-1] - recent_adx.iloc[0]
-        if adx_trend_value > 2:
-            adx_trend_emoji = "🟢"
-            adx_trend_text = "Increasing"
-        elif adx_trend_value < -2:
-            adx_trend_emoji = "🔴"
-            adx_trend_text = "Weakening"
-        else:
-            adx_trend_emoji = "⚪"
-            adx_trend_text = "Flat"
-        
-        # DI Spread (SIGNED: positive if +DI > -DI, negative if +DI < -DI)
-        di_spread = current_plus_di - current_minus_di
+        # CMF Calculation (21-period), one pass over the full history
+        cmf_full = calculate_cmf_series(df, period=21)
         
-        # Emoji based on spread magnitude and direction
-        if di_spread > 20:
-            di_emoji = "🟢"  # Strong bullish
-        elif di_spread > 10:
-            di_emoji = "🟡"  # Moderate bullish
-        elif di_spread > 0:
-            di_emoji = "⚪"  # Weak bullish
-        elif di_spread > -10:
-            di_emoji = "⚪"  # Weak bearish
-        elif di_spread > -20:
-            di_emoji = "🟠"  # Moderate bearish
-        else:
-            di_emoji = "🔴"  # Strong bearish
+        # Get last N sessions
+        return summarize_trend(
+            sector_name,
+            adx_series.tail(n_sessions).to_numpy(dtype=np.float64),
+            plus_di_series.tail(n_sessions).to_numpy(dtype=np.float64),
+            minus_di_series.tail(n_sessions).to_numpy(dtype=np.float64),
+            cmf_full.tail(n_sessions).to_numpy(dtype=np.float64) if cmf_full is not None else None
+        )
         
-        # Trend Strength based on ADX
-        if current_adx > 25:
-            trend_strength = "Strong"
-        elif current_adx > 20:
-            trend_strength = "Moderate"
-        else:
-            trend_strength = "Weak"
+    except Exception as e:
+        print(f"Error calculating trend for {sector_name}: {str(e)}")
+        return None
+
+
+def calculate_trend_matrix(sector_names, close, high, low, volume, n_sessions=4):
+    """
+    Calculate trend indicators for every sector in one batch
+    
+    ADX/DI and CMF series are computed for all sectors at once on stacked
+    arrays (see data_loader.panel_to_array); only the per-sector labelling
+    runs in Python.
+    
+    Args:
+        sector_names: Sector names, in the row order of the arrays
+        close: Close prices, shape (n_sectors, n_bars), left-padded with NaN
+        high: High prices, same shape as close
+        low: Low prices, same shape as close
+        volume: Volumes, same shape as close
+        n_sessions: Number of sessions to analyze (default: 4)
+    
+    Returns:
+        List of trend dictionaries (same keys as calculate_trend_indicators),
+        skipping sectors without enough history
+    """
+    adx, plus_di, minus_di, cmf = trend_matrix(
+        np.ascontiguousarray(close, dtype=KERNEL_DTYPE),
+        np.ascontiguousarray(high, dtype=KERNEL_DTYPE),
+        np.ascontiguousarray(low, dtype=KERNEL_DTYPE),
+        np.ascontiguousarray(volume, dtype=KERNEL_DTYPE),
+        14, 21, n_sessions
+    )
+    n_bars = (~np.isnan(close)).sum(axis=1)
+    
+    trend_data = []
+    for i, sector_name in enumerate(sector_names):
+        if n_bars[i] < n_sessions + 20:  # Need buffer for indicator calculation
+            continue
         
-        # CMF Calculation (21-period)
-        cmf_value = calculate_cmf(df, period=21)
+        try:
+            trend_data.append(summarize_trend(sector_name, adx[i], plus_di[i], minus_di[i], cmf[i]))
+        except Exception as e:
+            print(f"Error calculating trend for {sector_name}: {str(e)}")
+    
+    return trend_data
+
+
+def summarize_trend(sector_name, recent_adx, recent_plus_di, recent_minus_di, recent_cmf):
+    """
+    Label trend strength, direction and money flow from the last N sessions
+    
+    Args:
+        sector_name: Name of the sector
+        recent_adx: ADX values for the last N sessions (ndarray)
+        recent_plus_di: +DI values for the last N sessions (ndarray)
+        recent_minus_di: -DI values for the last N sessions (ndarray)
+        recent_cmf: CMF values for the last N sessions (ndarray or None)
+    
+    Returns:
+        Dictionary with trend analysis results
+    """
+    # Current values
+    current_adx = recent_adx[-1]
+    current_plus_di = recent_plus_di[-1]
+    current_minus_di = recent_minus_di[-1]
+    
+    # Normalized ADX (0-100 scale using min-max scaling over N sessions, NaN-skipping)
+    adx_min = np.fmin.reduce(recent_adx)
+    adx_max = np.fmax.reduce(recent_adx)
+    norm_adx = ((current_adx - adx_min) / (adx_max - adx_min) * 100) if adx_max > adx_min else 50.0
+    
+    # ADX Trend (Increasing/Weakening/Flat)
+    adx_trend_value = recent_adx[-1] - recent_adx[0]
+    adx_vote = 1 if adx_trend_value > 2 else -1 if adx_trend_value < -2 else 0
+    adx_trend_emoji, adx_trend_text = ADX_TREND_LABELS[adx_vote]
+    
+    # DI Spread (SIGNED: positive if +DI > -DI, negative if +DI < -DI)
+    di_spread = current_plus_di - current_minus_di
+    
+    # Emoji based on spread magnitude and direction
+    if di_spread > 20:
+        di_emoji = "🟢"  # Strong bullish
+    elif di_spread > 10:
+        di_emoji = "🟡"  # Moderate bullish
+    elif di_spread > 0:
+        di_emoji = "⚪"  # Weak bullish
+    elif di_spread > -10:
+        di_emoji = "⚪"  # Weak bearish
+    elif di_spread > -20:
+        di_emoji = "🟠"  # Moderate bearish
+    else:
+        di_emoji = "🔴"  # Strong bearish
+    
+    # Trend Strength based on ADX
+    if current_adx > 25:
+        trend_strength = "Strong"
+    elif current_adx > 20:
+        trend_strength = "Moderate"
+    else:
+        trend_strength = "Weak"
+    
+    # CMF (21-period) and its trend over the same sessions
+    cmf_value = None
+    if recent_cmf is not None and not np.isnan(recent_cmf[-1]):
+        cmf_value = recent_cmf[-1]
+    
+    if cmf_value is not None:
+        # CMF Trend (skipping missing and zero readings)
+        cmf_series = recent_cmf[~np.isnan(recent_cmf) & (recent_cmf != 0)]
         
-        if cmf_value is not None:
-            # CMF Trend (check last N sessions)
-            cmf_series = []
-            for i in range(n_sessions):
-                temp_df = df.iloc[:-(n_sessions-i-1)] if i < n_sessions-1 else df
-                cmf = calculate_cmf(temp_df, period=21)
-                if cmf:
-                    cmf_series.append(cmf)
-            
-            if len(cmf_series) >= 2:
-                cmf_trend_value = cmf_series[-1] - cmf_series[0]
-                if cmf_trend_value > 0.05:
-                    cmf_trend_emoji = "🟢"
-                    cmf_trend_text = "Accumulation"
-                elif cmf_trend_value < -0.05:
-                    cmf_trend_emoji = "🔴"
-                    cmf_trend_text = "Distribution"
-                else:
-                    cmf_trend_emoji = "⚪"
-                    cmf_trend_text = "Flat"
-            else:
-                cmf_trend_emoji = "⚪"
-                cmf_trend_text = "N/A"
+        if len(cmf_series) >= 2:
+            cmf_trend_value = cmf_series[-1] - cmf_series[0]
+            cmf_vote = 1 if cmf_trend_value > 0.05 else -1 if cmf_trend_value < -0.05 else 0
+            cmf_trend_emoji, cmf_trend_text = CMF_TREND_LABELS[cmf_vote]
         else:
-            cmf_value = 0.0
+            cmf_vote = 0
             cmf_trend_emoji = "⚪"
             cmf_trend_text = "N/A"
-        
-        # Generate Remark (based on combined signals - MAJORITY VOTING)
-        bullish_signals = 0
-        bearish_signals = 0
-        
-        # Signal 1: ADX trend
-        if adx_trend_text == "Increasing":
-            bullish_signals += 1
-        elif adx_trend_text == "Weakening":
-            bearish_signals += 1
-        
-        # Signal 2: DI spread direction
-        if di_spread > 0:
-            bullish_signals += 1
-        elif di_spread < 0:
-            bearish_signals += 1
-        
-        # Signal 3: CMF trend
-        if cmf_trend_text == "Accumulation":
-            bullish_signals += 1
-        elif cmf_trend_text == "Distribution":
-            bearish_signals += 1
-        
-        # Determine overall remark (Majority voting logic)
-        if bullish_signals >= 2 and bearish_signals == 0:
-            remark = "🟢 Bullish"
-        elif bearish_signals >= 2 and bullish_signals == 0:
-            remark = "🔴 Bearish"
-        elif bullish_signals > bearish_signals:
-            remark = "🟡 Bullish Bias"
-        elif bearish_signals > bullish_signals:
-            remark = "🟠 Bearish Bias"
-        else:
-            remark = "⚪ Sideway"
-        
-        return {
-            'Sector': sector_name,
-            'ADX': current_adx,
-            'Norm_ADX': norm_adx,
-            'ADX_Trend': f"{adx_trend_emoji} {adx_trend_text}",
-            'DI_Spread': di_spread,  # Raw signed value for ranking
-            'DI_Spread_Display': f"{di_emoji} {di_spread:+.1f}",  # For display with emoji and +/- sign
-            'Trend': trend_strength,
-            'CMF': cmf_value,
-            'CMF_Trend': f"{cmf_trend_emoji} {cmf_trend_text}",
-            'Remark': remark
-        }
-        
-    except Exception as e:
-        print(f"Error calculating trend for {sector_name}: {str(e)}")
-        return None
+    else:
+        cmf_value = 0.0
+        cmf_vote = 0
+        cmf_trend_emoji = "⚪"
+        cmf_trend_text = "N/A"
+    
+    # Generate Remark (based on combined signals - MAJORITY VOTING)
+    # Signals: ADX trend, DI spread direction, CMF trend; a net vote of
+    # +/-2 or more is a clear majority, +/-1 only a bias
+    di_vote = int(di_spread > 0) - int(di_spread < 0)
+    remark = REMARK_BY_VOTE[adx_vote + di_vote + cmf_vote]
+    
+    return {
+        'Sector': sector_name,
+        'ADX': current_adx,
+        'Norm_ADX': norm_adx,
+        'ADX_Trend': f"{adx_trend_emoji} {adx_trend_text}",
+        'DI_Spread': di_spread,  # Raw signed value for ranking
+        'DI_Spread_Display': f"{di_emoji} {di_spread:+.1f}",  # For display with emoji and +/- sign
+        'Trend': trend_strength,
+        'CMF': cmf_value,
+        'CMF_Trend': f"{cmf_trend_emoji} {cmf_trend_text}",
+        'Remark': remark
+    }
 
 
 def rank_by_trend_strength(trend_data):
@@ -178,37 +222,34 @@ def rank_by_trend_strength(trend_data):
     if not trend_data:
         return []
     
-    # Create scoring system
-    for item in trend_data:
-        score = 0
-        
-        # ADX contribution (0-40 points)
-        # Higher ADX = stronger trend regardless of direction
-        score += min(item['ADX'], 40)
-        
-        # Normalized ADX contribution (0-30 points)
-        # Shows relative strength within recent sessions
-        score += item['Norm_ADX'] * 0.3
-        
-        # DI Spread absolute magnitude contribution (0-20 points)
-        # Larger spread = clearer directional bias
-        score += min(abs(item['DI_Spread']), 20)
-        
-        # CMF absolute value contribution (0-10 points)
-        # Stronger money flow = more conviction
-        score += min(abs(item['CMF']) * 100, 10)
-        
-        item['_score'] = score
+    df = pd.DataFrame(trend_data)
+    
+    # Create scoring system (all sectors at once)
+    
+    # ADX contribution (0-40 points)
+    # Higher ADX = stronger trend regardless of direction
+    score = np.minimum(df['ADX'], 40)
+    
+    # Normalized ADX contribution (0-30 points)
+    # Shows relative strength within recent sessions
+    score = score + df['Norm_ADX'] * 0.3
+    
+    # DI Spread absolute magnitude contribution (0-20 points)
+    # Larger spread = clearer directional bias
+    score = score + np.minimum(df['DI_Spread'].abs(), 20)
+    
+    # CMF absolute value contribution (0-10 points)
+    # Stronger money flow = more conviction
+    score = score + np.minimum(df['CMF'].abs() * 100, 10)
     
-    # Sort by score (descending) - Highest score = strongest trend
-    ranked = sorted(trend_data, key=lambda x: x['_score'], reverse=True)
+    # Sort by score (descending, ties keep input order) - Highest score = strongest trend
+    order = np.argsort(-score.to_numpy(), kind='stable')
+    ranked = df.iloc[order].reset_index(drop=True)
     
-    # Add rank and remove internal score
-    for i, item in enumerate(ranked, 1):
-        item['Rank'] = i
-        del item['_score']
+    # Add rank
+    ranked['Rank'] = np.arange(1, len(ranked) + 1)
     
-    return ranked
+    return ranked.to_dict('records')
 
 
 def get_trend_summary(trend_data):
@@ -224,9 +265,9 @@ def get_trend_summary(trend_data):
     if not trend_data:
         return None
     
-    bullish_count = sum(1 for item in trend_data if '🟢' in item['Remark'])
-    bearish_count = sum(1 for item in trend_data if '🔴' in item['Remark'])
-    neutral_count = sum(1 for item in trend_data if '⚪' in item['Remark'])
+    bullish_count = sum(1 for item in trend_data if item['Remark'] in BULLISH_REMARKS)
+    bearish_count = sum(1 for item in trend_data if item['Remark'] in BEARISH_REMARKS)
+    neutral_count = sum(1 for item in trend_data if item['Remark'] in NEUTRAL_REMARKS)
     
     avg_adx = np.mean([item['ADX'] for item in trend_data])
     avg_di_spread = np.mean([item['DI_Spread'] for item in trend_data])
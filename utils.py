@@ -3,11 +3,41 @@ Utility Functions Module
 Helper functions for data formatting, validation, and analysis
 """
 
+import bisect
+import io
+import time
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time as dt_time
 import streamlit as st
 
+from indicators_numba import min_max_scale, rolling_mean, z_scores
+
+
+def _isna(value):
+    """
+    Check a single value for None/NaN without pandas' array dispatch
+    
+    Args:
+        value: Scalar value
+    
+    Returns:
+        True for None, NaN, pd.NA and pd.NaT
+    """
+    if isinstance(value, (float, np.floating)):
+        return value != value
+    return value is None or value is pd.NA or value is pd.NaT
+
+
+@lru_cache(maxsize=64)
+def _number_formatter(decimal_places, prefix, suffix):
+    """Bound str.format with the decimal places, prefix and suffix baked in"""
+    def escape(text):
+        return text.replace("{", "{{").replace("}", "}}")
+    
+    return f"{escape(prefix)}{{:.{decimal_places}f}}{escape(suffix)}".format
+
 
 def format_number(value, decimal_places=2, prefix="", suffix=""):
     """
@@ -22,16 +52,52 @@ def format_number(value, decimal_places=2, prefix="", suffix=""):
     Returns:
         Formatted string
     """
-    if value is None or pd.isna(value):
+    if _isna(value):
         return "N/A"
     
     try:
-        formatted = f"{value:.{decimal_places}f}"
-        return f"{prefix}{formatted}{suffix}"
+        return _number_formatter(decimal_places, prefix, suffix)(value)
     except (ValueError, TypeError):
         return "N/A"
 
 
+def _format_array(values, fmt):
+    """
+    Apply a printf-style format to every value of an array at once
+    
+    Args:
+        values: Array-like of numbers (Series, ndarray or list)
+        fmt: printf-style format for a single value (e.g., '%.2f')
+    
+    Returns:
+        ndarray of object dtype with formatted strings ("N/A" for missing)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    
+    out = np.full(values.shape, "N/A", dtype=object)
+    out[~missing] = np.char.mod(fmt, values[~missing])
+    
+    return out
+
+
+def format_number_series(values, decimal_places=2, prefix="", suffix=""):
+    """
+    Format a whole array of numbers (batch version of format_number)
+    
+    Args:
+        values: Array-like of numbers (Series, ndarray or list)
+        decimal_places: Number of decimal places
+        prefix: String to prepend (e.g., '₹', '$')
+        suffix: String to append (e.g., '%', 'M')
+    
+    Returns:
+        ndarray of object dtype with formatted strings
+    """
+    fmt = f"{prefix.replace('%', '%%')}%.{decimal_places}f{suffix.replace('%', '%%')}"
+    return _format_array(values, fmt)
+
+
 def format_percentage(value, decimal_places=2, show_sign=True):
     """
     Format percentage value
@@ -44,7 +110,7 @@ def format_percentage(value, decimal_places=2, show_sign=True):
     Returns:
         Formatted percentage string
     """
-    if value is None or pd.isna(value):
+    if _isna(value):
         return "N/A"
     
     try:
@@ -56,6 +122,27 @@ def format_percentage(value, decimal_places=2, show_sign=True):
         return "N/A"
 
 
+def format_percentage_series(values, decimal_places=2, show_sign=True):
+    """
+    Format a whole array of percentages (batch version of format_percentage)
+    
+    Args:
+        values: Array-like of percentage values
+        decimal_places: Number of decimal places
+        show_sign: Whether to show +/- sign
+    
+    Returns:
+        ndarray of object dtype with formatted strings
+    """
+    sign = "+" if show_sign else ""
+    return _format_array(values, f"%{sign}.{decimal_places}f%%")
+
+
+# Indian numbering units: 1 Lakh and 1 Crore
+CURRENCY_UNIT_BREAKS = (100000, 10000000)
+CURRENCY_UNITS = ((100000, "L"), (10000000, "Cr"))
+
+
 def format_currency(value, symbol="₹", decimal_places=2):
     """
     Format currency value with Indian numbering system
@@ -68,61 +155,98 @@ def format_currency(value, symbol="₹", decimal_places=2):
     Returns:
         Formatted currency string
     """
-    if value is None or pd.isna(value):
+    if _isna(value):
         return "N/A"
     
     try:
-        # Convert to crores if value is large
-        if abs(value) >= 10000000:  # 1 Crore
-            crore_value = value / 10000000
-            return f"{symbol}{crore_value:.2f}Cr"
-        elif abs(value) >= 100000:  # 1 Lakh
-            lakh_value = value / 100000
-            return f"{symbol}{lakh_value:.2f}L"
-        else:
+        # Convert to lakhs/crores if value is large
+        unit = bisect.bisect_right(CURRENCY_UNIT_BREAKS, abs(value))
+        if unit == 0:
             return f"{symbol}{value:.{decimal_places}f}"
+        
+        divisor, suffix = CURRENCY_UNITS[unit - 1]
+        return f"{symbol}{value / divisor:.2f}{suffix}"
     except (ValueError, TypeError):
         return "N/A"
 
 
+# Signal emojis from weakest to strongest
+SIGNAL_EMOJIS = ("🔴", "🟠", "🟡", "🟢")
+
+
+def make_thresholds(thresholds, reverse=False):
+    """
+    Resolve a thresholds dict into the tuple get_signal_emoji works on
+    
+    Build it once and pass it for every row to skip the dict lookups.
+    
+    Args:
+        thresholds: Dict with 'high', 'medium', 'low' keys (missing keys use
+            get_signal_emoji's defaults)
+        reverse: If True, use the defaults for reversed logic (lower is better)
+    
+    Returns:
+        Tuple: (low, medium, high)
+    """
+    if isinstance(thresholds, tuple):
+        return thresholds
+    if reverse:
+        return (thresholds.get('low', 30), thresholds.get('medium', 50), thresholds.get('high', 70))
+    return (thresholds.get('low', 20), thresholds.get('medium', 40), thresholds.get('high', 70))
+
+
 def get_signal_emoji(value, thresholds, reverse=False):
     """
     Get emoji based on value and thresholds
     
     Args:
         value: Numeric value to evaluate
-        thresholds: Dict with 'high', 'medium', 'low' keys
+        thresholds: Dict with 'high', 'medium', 'low' keys, or a
+            (low, medium, high) tuple from make_thresholds
         reverse: If True, reverse the emoji logic (lower is better)
     
     Returns:
         Emoji string
     """
-    if value is None or pd.isna(value):
+    if _isna(value):
         return "⚪"
     
     try:
+        bounds = make_thresholds(thresholds, reverse)
         if not reverse:
-            if value >= thresholds.get('high', 70):
-                return "🟢"
-            elif value >= thresholds.get('medium', 40):
-                return "🟡"
-            elif value >= thresholds.get('low', 20):
-                return "🟠"
-            else:
-                return "🔴"
-        else:
-            if value <= thresholds.get('low', 30):
-                return "🟢"
-            elif value <= thresholds.get('medium', 50):
-                return "🟡"
-            elif value <= thresholds.get('high', 70):
-                return "🟠"
-            else:
-                return "🔴"
+            return SIGNAL_EMOJIS[bisect.bisect_right(bounds, value)]
+        return SIGNAL_EMOJIS[len(bounds) - bisect.bisect_left(bounds, value)]
     except (ValueError, TypeError):
         return "⚪"
 
 
+def get_signal_emoji_series(values, thresholds, reverse=False):
+    """
+    Get emojis for a whole array of values (batch version of get_signal_emoji)
+    
+    Args:
+        values: Array-like of numeric values
+        thresholds: Dict with 'high', 'medium', 'low' keys, or a
+            (low, medium, high) tuple from make_thresholds
+        reverse: If True, reverse the emoji logic (lower is better)
+    
+    Returns:
+        ndarray of object dtype with emoji strings
+    """
+    values = np.asarray(values, dtype=np.float64)
+    bounds = np.array(make_thresholds(thresholds, reverse), dtype=np.float64)
+    
+    if not reverse:
+        idx = np.searchsorted(bounds, values, side='right')
+    else:
+        idx = len(bounds) - np.searchsorted(bounds, values, side='left')
+    
+    emojis = np.array(SIGNAL_EMOJIS, dtype=object)[idx]
+    emojis[np.isnan(values)] = "⚪"
+    
+    return emojis
+
+
 def get_trend_emoji(current, previous):
     """
     Get trend emoji based on comparison
@@ -134,10 +258,7 @@ def get_trend_emoji(current, previous):
     Returns:
         Emoji string (up/down/flat arrow)
     """
-    if current is None or previous is None:
-        return "➡️"
-    
-    if pd.isna(current) or pd.isna(previous):
+    if _isna(current) or _isna(previous):
         return "➡️"
     
     diff = current - previous
@@ -161,10 +282,7 @@ def calculate_percentage_change(current, previous):
     Returns:
         Percentage change
     """
-    if current is None or previous is None or previous == 0:
-        return None
-    
-    if pd.isna(current) or pd.isna(previous):
+    if _isna(current) or _isna(previous) or previous == 0:
         return None
     
     return ((current - previous) / abs(previous)) * 100
@@ -184,10 +302,7 @@ def normalize_value(value, min_val, max_val, target_min=0, target_max=100):
     Returns:
         Normalized value
     """
-    if value is None or min_val is None or max_val is None:
-        return None
-    
-    if pd.isna(value) or pd.isna(min_val) or pd.isna(max_val):
+    if _isna(value) or _isna(min_val) or _isna(max_val):
         return None
     
     if max_val == min_val:
@@ -198,6 +313,24 @@ def normalize_value(value, min_val, max_val, target_min=0, target_max=100):
     return normalized
 
 
+def normalize_values(values, min_val, max_val, target_min=0, target_max=100):
+    """
+    Normalize a whole array using min-max scaling (batch normalize_value)
+    
+    Args:
+        values: Array-like of values to normalize
+        min_val: Minimum value in dataset
+        max_val: Maximum value in dataset
+        target_min: Target minimum (default: 0)
+        target_max: Target maximum (default: 100)
+    
+    Returns:
+        float64 ndarray of normalized values (NaN where input is missing)
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64).ravel()
+    return min_max_scale(values, float(min_val), float(max_val), float(target_min), float(target_max))
+
+
 def calculate_z_score(value, mean, std):
     """
     Calculate z-score for a value
@@ -210,15 +343,28 @@ def calculate_z_score(value, mean, std):
     Returns:
         Z-score
     """
-    if value is None or mean is None or std is None or std == 0:
-        return None
-    
-    if pd.isna(value) or pd.isna(mean) or pd.isna(std):
+    if _isna(value) or _isna(mean) or _isna(std) or std == 0:
         return None
     
     return (value - mean) / std
 
 
+def calculate_z_scores(values, mean, std):
+    """
+    Calculate z-scores for a whole array (batch calculate_z_score)
+    
+    Args:
+        values: Array-like of values
+        mean: Mean of the dataset
+        std: Standard deviation of the dataset
+    
+    Returns:
+        float64 ndarray of z-scores (all NaN if std is zero or missing)
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64).ravel()
+    return z_scores(values, float(mean), float(std))
+
+
 def is_outlier(value, mean, std, threshold=3):
     """
     Check if value is an outlier using z-score method
@@ -240,6 +386,31 @@ def is_outlier(value, mean, std, threshold=3):
     return abs(z_score) > threshold
 
 
+def outlier_mask(values, threshold=3):
+    """
+    Flag outliers in a whole array using the z-score method
+    
+    Mean and (sample) standard deviation are taken from the array itself,
+    ignoring missing values.
+    
+    Args:
+        values: Array-like of values
+        threshold: Z-score threshold (default: 3)
+    
+    Returns:
+        Boolean ndarray (False for missing values or a constant array)
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64).ravel()
+    valid = values[~np.isnan(values)]
+    
+    if len(valid) < 2:
+        return np.zeros(len(values), dtype=bool)
+    
+    scores = calculate_z_scores(values, valid.mean(), valid.std(ddof=1))
+    
+    return np.abs(scores) > threshold
+
+
 def get_time_until_next_hour():
     """
     Calculate time remaining until next hour
@@ -278,24 +449,39 @@ def format_timedelta(td):
         return f"{hours}h {minutes}m"
 
 
+# Market hours: 9:15 AM to 3:30 PM IST
+MARKET_OPEN_TIME = dt_time(9, 15)
+MARKET_CLOSE_TIME = dt_time(15, 30)
+
+# Last is_market_open() answer and the wall-clock second it was computed in
+_market_open_cache = {'second': None, 'is_open': False}
+
+
 def is_market_open():
     """
     Check if Indian stock market is currently open
     
+    The answer is reused for calls within the same wall-clock second.
+    
     Returns:
         Boolean indicating if market is open
     """
+    second = int(time.time())
+    if _market_open_cache['second'] == second:
+        return _market_open_cache['is_open']
+    
     now = datetime.now()
     
     # Market is closed on weekends
     if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
-        return False
+        is_open = False
+    else:
+        is_open = MARKET_OPEN_TIME <= now.time() <= MARKET_CLOSE_TIME
     
-    # Market hours: 9:15 AM to 3:30 PM IST
-    market_open = now.replace(hour=9, minute=15, second=0, microsecond=0)
-    market_close = now.replace(hour=15, minute=30, second=0, microsecond=0)
+    _market_open_cache['second'] = second
+    _market_open_cache['is_open'] = is_open
     
-    return market_open <= now <= market_close
+    return is_open
 
 
 def get_market_status():
@@ -308,10 +494,10 @@ def get_market_status():
     if is_market_open():
         return "Market Open", "🟢"
     else:
-        now = datetime.now()
-        if now.weekday() >= 5:
+        now = time.localtime()
+        if now.tm_wday >= 5:
             return "Weekend - Market Closed", "🔴"
-        elif now.hour < 9 or (now.hour == 9 and now.minute < 15):
+        elif (now.tm_hour, now.tm_min) < (MARKET_OPEN_TIME.hour, MARKET_OPEN_TIME.minute):
             return "Pre-Market", "🟡"
         else:
             return "After-Hours", "🟠"
@@ -329,19 +515,16 @@ def safe_divide(numerator, denominator, default=None):
     Returns:
         Result of division or default value
     """
-    if numerator is None or denominator is None:
-        return default
-    
-    if pd.isna(numerator) or pd.isna(denominator):
-        return default
-    
-    if denominator == 0:
-        return default
-    
     try:
-        return numerator / denominator
+        # NumPy scalars return inf/NaN on a zero denominator instead of raising
+        if denominator == 0:
+            return default
+        result = numerator / denominator
     except (ValueError, TypeError, ZeroDivisionError):
         return default
+    
+    # Missing inputs (None raises above; NaN/NA/NaT propagate) give a missing result
+    return default if _isna(result) else result
 
 
 def calculate_moving_average(series, window):
@@ -359,11 +542,25 @@ def calculate_moving_average(series, window):
         return None
     
     try:
-        return series.rolling(window=window).mean()
+        # Degenerate windows keep pandas' own validation and result
+        if not isinstance(window, (int, np.integer)) or window < 1:
+            return series.rolling(window=window).mean()
+        
+        values = np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+        return pd.Series(rolling_mean(values, window), index=series.index, name=series.name)
     except Exception:
         return None
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def _encode_csv(df):
+    """Encode a dataframe as UTF-8 CSV bytes (cached per dataframe content)"""
+    # Write encoded bytes straight into the buffer instead of a str copy first
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8')
+    return buffer.getvalue()
+
+
 def dataframe_to_csv(df, filename=None):
     """
     Convert dataframe to CSV for download
@@ -379,7 +576,8 @@ def dataframe_to_csv(df, filename=None):
         return None
     
     try:
-        return df.to_csv(index=False).encode('utf-8')
+        # Streamlit reruns the script on every interaction; encode each table once
+        return _encode_csv(df)
     except Exception as e:
         st.error(f"Error converting to CSV: {str(e)}")
         return None
@@ -427,14 +625,67 @@ def highlight_top_values(df, column, top_n=3, color='lightgreen'):
     if df is None or df.empty or column not in df.columns:
         return df
     
-    def highlight(s):
-        if s.name == column:
-            # Get top N values
-            top_vals = s.nlargest(top_n).values
-            return [f'background-color: {color}' if v in top_vals else '' for v in s]
-        return ['' for _ in s]
+    def highlight(frame):
+        # One style matrix for the whole frame; only the target column is set
+        styles = np.full(frame.shape, '', dtype=object)
+        
+        # Top N values are those >= the N-th largest (ties included)
+        values = frame[column].to_numpy(dtype=np.float64)
+        valid = values[~np.isnan(values)]
+        top_n_valid = min(top_n, len(valid))
+        
+        if top_n_valid > 0:
+            kth = len(valid) - top_n_valid
+            top = values >= np.partition(valid, kth)[kth]
+            styles[top, frame.columns.get_loc(column)] = f'background-color: {color}'
+        
+        return pd.DataFrame(styles, index=frame.index, columns=frame.columns)
+    
+    return df.style.apply(highlight, axis=None)
+
+
+class SectorMatrix:
+    """
+    One column of every sector aligned into a single float64 array
+    
+    Attributes:
+        data: C-ordered ndarray of shape (n_dates, n_sectors), NaN where a
+            sector has no bar on a date
+        sectors: List of sector names (column order of data)
+        index: DatetimeIndex of the rows (union of all sectors' dates)
+    """
+    
+    __slots__ = ('data', 'sectors', 'index')
+    
+    def __init__(self, data, sectors, index):
+        self.data = data
+        self.sectors = sectors
+        self.index = index
     
-    return df.style.apply(highlight, axis=0)
+    @classmethod
+    def from_dict(cls, sector_data_dict, column='Close'):
+        """
+        Align one column of every non-empty sector dataframe
+        
+        Args:
+            sector_data_dict: Dictionary of sector dataframes
+            column: Column to extract (default: Close)
+        
+        Returns:
+            SectorMatrix (with no sectors if none has the column)
+        """
+        columns = {
+            sector: df[column]
+            for sector, df in sector_data_dict.items()
+            if column in df.columns and len(df) > 0
+        }
+        combined_df = pd.DataFrame(columns)
+        
+        return cls(
+            np.ascontiguousarray(combined_df.to_numpy(dtype=np.float64)),
+            list(combined_df.columns),
+            combined_df.index
+        )
 
 
 def calculate_correlation_matrix(sector_data_dict):
@@ -442,7 +693,8 @@ def calculate_correlation_matrix(sector_data_dict):
     Calculate correlation matrix between sectors
     
     Args:
-        sector_data_dict: Dictionary of sector dataframes
+        sector_data_dict: Dictionary of sector dataframes, or a SectorMatrix
+            of close prices
     
     Returns:
         Correlation matrix DataFrame
@@ -451,25 +703,32 @@ def calculate_correlation_matrix(sector_data_dict):
         return None
     
     try:
-        # Extract close prices for all sectors
-        close_prices = {}
-        for sector, df in sector_data_dict.items():
-            if 'Close' in df.columns and len(df) > 0:
-                close_prices[sector] = df['Close']
+        # Close prices of all sectors, aligned on the union of dates
+        if isinstance(sector_data_dict, SectorMatrix):
+            matrix = sector_data_dict
+        else:
+            matrix = SectorMatrix.from_dict(sector_data_dict)
         
-        if not close_prices:
+        if not matrix.sectors:
             return None
         
-        # Create combined dataframe
-        combined_df = pd.DataFrame(close_prices)
+        prices = matrix.data
         
-        # Calculate percentage changes
-        pct_change_df = combined_df.pct_change().dropna()
+        # Percentage changes, keeping only dates where every sector has one
+        returns = prices[1:] / prices[:-1] - 1
+        returns = returns[~np.isnan(returns).any(axis=1)]
         
-        # Calculate correlation
-        correlation_matrix = pct_change_df.corr()
+        if len(returns) < 2:
+            correlation = np.full((prices.shape[1],) * 2, np.nan)
+        else:
+            # Pearson correlation as one matrix product of the centered returns
+            returns -= returns.mean(axis=0)
+            covariance = returns.T @ returns
+            scale = np.sqrt(np.diag(covariance))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                correlation = covariance / np.outer(scale, scale)
         
-        return correlation_matrix
+        return pd.DataFrame(correlation, index=matrix.sectors, columns=matrix.sectors)
     except Exception as e:
         print(f"Error calculating correlation: {str(e)}")
         return None
@@ -490,17 +749,27 @@ def get_summary_statistics(df, column='Close'):
         return None
     
     try:
-        series = df[column].dropna()
+        values = df[column].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        count = len(values)
+        
+        if count == 0:
+            minimum = q25 = median = q75 = maximum = mean = std = np.nan
+        else:
+            # One partition-based call covers all five order statistics
+            minimum, q25, median, q75, maximum = np.quantile(values, [0, 0.25, 0.5, 0.75, 1])
+            mean = values.mean()
+            std = values.std(ddof=1) if count > 1 else np.nan
         
         return {
-            'count': len(series),
-            'mean': series.mean(),
-            'median': series.median(),
-            'std': series.std(),
-            'min': series.min(),
-            'max': series.max(),
-            'q25': series.quantile(0.25),
-            'q75': series.quantile(0.75)
+            'count': count,
+            'mean': mean,
+            'median': median,
+            'std': std,
+            'min': minimum,
+            'max': maximum,
+            'q25': q25,
+            'q75': q75
         }
     except Exception as e:
         print(f"Error calculating statistics: {str(e)}")
@@ -519,7 +788,7 @@ def validate_numeric_range(value, min_val=None, max_val=None):
     Returns:
         Tuple: (is_valid, error_message)
     """
-    if value is None or pd.isna(value):
+    if _isna(value):
         return False, "Value is None or NaN"
     
     try:
@@ -536,6 +805,10 @@ def validate_numeric_range(value, min_val=None, max_val=None):
         return False, "Value is not numeric"
 
 
+# Red-to-green gradient, one pre-formatted color per 8-bit green level
+_RED_GREEN_GRADIENT = tuple(f"rgb({255 - g}, {g}, 0)" for g in range(256))
+
+
 def create_color_gradient(value, min_val, max_val, start_color='red', end_color='green'):
     """
     Create color gradient based on value position between min and max
@@ -562,10 +835,7 @@ def create_color_gradient(value, min_val, max_val, start_color='red', end_color=
     
     # Simple color interpolation (red to green)
     if start_color == 'red' and end_color == 'green':
-        r = int(255 * (1 - normalized))
-        g = int(255 * normalized)
-        b = 0
-        return f"rgb({r}, {g}, {b})"
+        return _RED_GREEN_GRADIENT[int(255 * normalized)]
     
     return "rgb(128, 128, 128)"
 
@@ -581,7 +851,7 @@ def log_error(error_message, context=""):
     Returns:
         None (prints to console)
     """
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
     log_entry = f"[{timestamp}] ERROR"
     
     if context: